@@ -1,13 +1,27 @@
-from flask import Flask, g, render_template, redirect, url_for, request, flash, session, jsonify, Response
+from flask import Flask, g, render_template, redirect, url_for, request, flash, session, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import case, create_engine, func, inspect, text
+from sqlalchemy import and_, case, create_engine, delete, event, exists, func, insert, inspect, literal, or_, select, text, update
+from sqlalchemy.dialects.mysql import MEDIUMBLOB, insert as mysql_insert
 from sqlalchemy.engine import make_url
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash
 from config import Config
+from password_hashing import PasswordHashPool, PasswordHashPoolBusy
+import base64
+import binascii
+import click
+import csv
+import hashlib
+import hmac
+import io
 import json
+import math
 import os
+import queue
 import re
+import socket
+import threading
 import time
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
 from secrets import token_urlsafe
 
@@ -16,6 +30,11 @@ try:
 except ImportError:
     Migrate = None
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
 app = Flask(__name__)
 app.config.from_object(Config)
 # Dev-time reload/cache behavior so template/CSS/JS edits are visible
@@ -32,6 +51,18 @@ EMAIL_RE = re.compile(r'^[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}$')
 LANGUAGE_RE = re.compile(r'^[A-Za-z]{2,8}(?:-[A-Za-z]{2,8})?$')
 MAX_FAILED_LOGIN_ATTEMPTS = 5
 LOGIN_LOCK_MINUTES = 15
+MAX_IMPORT_ROWS = 10000
+IMPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 500
+MAX_WORKOUTS_PAGE_SIZE = 500
+MAX_BATCH_WORKOUT_IDS = 500
+MAX_TAG_ANALYTICS_DAYS = 366
+ADMIN_USERS_PAGE_SIZE = 25
+MAX_ADMIN_USERS_PAGE_SIZE = 200
+ADMIN_USER_SORTS = ('username_asc', 'username_desc', 'active_desc', 'avg_cal_desc', 'archived_desc')
+AVATAR_MIMETYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/webp')
+AVATAR_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+SESSION_REVOKING_EVENTS = ('user_archived', 'user_deletion_queued', 'user_deleted')
 
 
 def _clean_text(value, max_len=None):
@@ -106,19 +137,71 @@ def _lock_minutes_remaining(user):
 
 
 def _register_login_failure(user):
+    # Counted in login_failures; the user row is only written when a lock is
+    # imposed. Returns True when the caller has a change to commit.
     if not user:
-        return
-    user.failed_attempts = (user.failed_attempts or 0) + 1
-    if user.failed_attempts >= MAX_FAILED_LOGIN_ATTEMPTS:
-        user.locked_until = datetime.utcnow() + timedelta(minutes=LOGIN_LOCK_MINUTES)
-        user.failed_attempts = 0
+        return False
+    failures = login_failures.incr(user.id, LOGIN_LOCK_MINUTES * 60)
+    if failures < MAX_FAILED_LOGIN_ATTEMPTS:
+        return False
+    user.locked_until = datetime.utcnow() + timedelta(minutes=LOGIN_LOCK_MINUTES)
+    login_failures.reset(user.id)
+    return True
 
 
 def _clear_login_failures(user):
     if not user:
         return
-    user.failed_attempts = 0
-    user.locked_until = None
+    login_failures.reset(user.id)
+    if user.locked_until is not None:
+        user.locked_until = None
+
+
+_hash_prefix_lock = threading.Lock()
+_hash_prefixes = {}
+
+
+def _password_hash_prefix(method):
+    # Werkzeug expands short forms (e.g. 'pbkdf2:sha256') with its own
+    # defaults, so learn the stored "method$" prefix from one real hash.
+    with _hash_prefix_lock:
+        prefix = _hash_prefixes.get(method)
+        if prefix is None:
+            prefix = generate_password_hash('', method=method).split('$', 1)[0]
+            _hash_prefixes[method] = prefix
+        return prefix
+
+
+password_pool = PasswordHashPool(
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    queue_size=app.config['PASSWORD_HASH_QUEUE_SIZE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+)
+
+
+def hash_password(password):
+    # Raises PasswordHashPoolBusy when the pool is saturated (answered with 503).
+    return password_pool.hash(password, app.config['PASSWORD_HASH_METHOD'])
+
+
+def verify_password(stored_hash, password):
+    return bool(stored_hash) and password_pool.verify(stored_hash, password)
+
+
+def password_needs_rehash(stored_hash):
+    stored_method = (stored_hash or '').split('$', 1)[0]
+    return stored_method != _password_hash_prefix(app.config['PASSWORD_HASH_METHOD'])
+
+
+def _upgrade_password_hash(user, password):
+    # Called after a successful verify, while the plaintext is at hand. The
+    # upgrade is optional: a busy pool skips it and the next login retries.
+    if not password_needs_rehash(user.password):
+        return
+    try:
+        user.password = hash_password(password)
+    except PasswordHashPoolBusy:
+        app.logger.info('Password rehash for user %s deferred; hash pool busy', user.id)
 
 
 def _validate_runtime_config():
@@ -184,8 +267,11 @@ def add_security_headers(response):
     )
     if request.is_secure:
         response.headers.setdefault('Strict-Transport-Security', 'max-age=31536000; includeSubDomains')
-    if request.path.startswith('/api/') or 'user_id' in session:
-        response.headers['Cache-Control'] = 'no-store'
+    # Avatars are content-addressed and set their own long-lived caching.
+    if (request.path.startswith('/api/') or 'user_id' in session) and not request.path.startswith('/avatars/'):
+        # Responses with a validator may sit in the browser's private cache,
+        # but are revalidated (If-None-Match -> 304) on every use.
+        response.headers['Cache-Control'] = 'private, no-cache' if response.headers.get('ETag') else 'no-store'
     return response
 
 
@@ -213,6 +299,49 @@ def _wants_json_response():
     )
 
 
+def _rate_limit_budget(method, rule):
+    # Exact '<METHOD> <route>' entries win; '<METHOD> <prefix>/*' entries
+    # cover every route below the prefix with one shared bucket.
+    limits = app.config['RATE_LIMITS']
+    scope = f'{method} {rule}'
+    if scope in limits:
+        return scope, limits[scope]
+    for pattern, budget in limits.items():
+        if pattern.endswith('/*') and scope.startswith(pattern[:-1]):
+            return pattern, budget
+    return None, None
+
+
+@app.before_request
+def enforce_rate_limits():
+    if not app.config['RATE_LIMIT_ENABLED'] or request.url_rule is None:
+        return None
+    scope, budget = _rate_limit_budget(request.method, request.url_rule.rule)
+    if budget is None:
+        return None
+
+    # One bucket per client address, plus one per account so rotating
+    # addresses doesn't lift the limit on a single login or user.
+    keys = [f'{scope}|ip:{request.remote_addr}']
+    if session.get('user_id'):
+        keys.append(f'{scope}|user:{session["user_id"]}')
+    elif request.endpoint in ('login', 'admin_login'):
+        email = _clean_email(request.form.get('email'))
+        if email:
+            keys.append(f'{scope}|email:{email}')
+
+    capacity, period = budget
+    wait = rate_limiter.acquire(keys, capacity, period)
+    if not wait:
+        return None
+    return _shed_response(
+        'rate_limited',
+        'Too many attempts. Please wait a moment and try again.',
+        429,
+        max(1, math.ceil(wait)),
+    )
+
+
 @app.before_request
 def enforce_csrf():
     if request.method not in ('POST', 'PUT', 'PATCH', 'DELETE'):
@@ -236,13 +365,9 @@ def enforce_session_identity():
     if not user_id or role not in ('user', 'admin'):
         return None
 
-    current_user = db.session.get(User, user_id)
-    session_invalid = (
-        not current_user
-        or current_user.role != role
-        or (role == 'user' and current_user.is_archived)
-    )
-    if not session_invalid:
+    current_user = load_session_identity(user_id)
+    if session_identity_allows(current_user, role):
+        g.session_identity = current_user
         return None
 
     session.clear()
@@ -264,9 +389,17 @@ class User(db.Model):
     failed_attempts = db.Column(db.Integer, nullable=False, default=0)
     locked_until = db.Column(db.DateTime, nullable=True)
     is_archived = db.Column(db.Boolean, nullable=False, default=False)
-    avatar_url = db.Column(db.Text, nullable=True)
+    avatar_hash = db.Column(db.String(64), nullable=True)
+    data_version = db.Column(db.BigInteger, nullable=False, default=0)  # bumped on every workout write
     workouts = db.relationship('Workout', backref='user', lazy=True)
 
+class Avatar(db.Model):
+    __tablename__ = 'avatar'
+    hash = db.Column(db.String(64), primary_key=True)  # sha256 of data
+    mimetype = db.Column(db.String(40), nullable=False)
+    data = db.Column(db.LargeBinary().with_variant(MEDIUMBLOB(), 'mysql'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+
 workout_tag = db.Table(
     'workout_tag',
     db.Column('workout_id', db.Integer, db.ForeignKey('workout.id'), primary_key=True),
@@ -282,11 +415,24 @@ class Workout(db.Model):
     calories = db.Column(db.Integer, nullable=False)
     date = db.Column(db.Date, nullable=False)
     archived = db.Column(db.Boolean, nullable=False, default=False)
+    change_version = db.Column(db.BigInteger, nullable=False, default=0)  # user.data_version of last change
     tags = db.relationship('ActivityTag', secondary=workout_tag, backref=db.backref('workouts', lazy='dynamic'))
     __table_args__ = (
         db.Index('idx_workout_user_date', 'user_id', 'date'),
         db.Index('idx_workout_user_archived', 'user_id', 'archived'),
         db.Index('idx_workout_activity', 'activity'),
+        db.Index('idx_workout_user_version', 'user_id', 'change_version'),
+    )
+
+class WorkoutTombstone(db.Model):
+    __tablename__ = 'workout_tombstone'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    workout_id = db.Column(db.Integer, nullable=False)
+    change_version = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+    __table_args__ = (
+        db.Index('idx_tombstone_user_version', 'user_id', 'change_version'),
     )
 
 class ActivityTag(db.Model):
@@ -303,7 +449,26 @@ class DailySummary(db.Model):
     total_workouts = db.Column(db.Integer, nullable=False, default=0)
     total_calories = db.Column(db.Integer, nullable=False, default=0)
     total_duration = db.Column(db.Integer, nullable=False, default=0)
-    __table_args__ = (db.UniqueConstraint('user_id', 'summary_date', name='uniq_user_day'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'summary_date', name='uniq_user_day'),
+        db.Index('idx_daily_summary_date', 'summary_date'),
+    )
+
+class TagDailySummary(db.Model):
+    # Per-user, per-tag, per-day rollup of active workouts, maintained
+    # alongside DailySummary so tag analytics never scan workout_tag.
+    __tablename__ = 'tag_daily_summary'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    tag_id = db.Column(db.Integer, db.ForeignKey('activity_tag.id'), nullable=False)
+    summary_date = db.Column(db.Date, nullable=False)
+    total_workouts = db.Column(db.Integer, nullable=False, default=0)
+    total_calories = db.Column(db.Integer, nullable=False, default=0)
+    total_duration = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'summary_date', 'tag_id', name='uniq_user_day_tag'),
+        db.Index('idx_tag_summary_date', 'summary_date'),
+    )
 
 class WeeklyGoal(db.Model):
     __tablename__ = 'weekly_goal'
@@ -324,6 +489,23 @@ class AdminAuditLog(db.Model):
     action = db.Column(db.String(80), nullable=False)
     details = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+    # Set once the logged action has finished when it runs in the background.
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+class UserDeletionJob(db.Model):
+    __tablename__ = 'user_deletion_job'
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key: the row outlives the user it deletes.
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    username = db.Column(db.String(150), nullable=True)
+    audit_log_id = db.Column(db.Integer, db.ForeignKey('admin_audit_log.id'), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    workouts_total = db.Column(db.Integer, nullable=False, default=0)
+    workouts_deleted = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    completed_at = db.Column(db.DateTime, nullable=True)
 
 class ImportExportHistory(db.Model):
     __tablename__ = 'import_export_history'
@@ -380,7 +562,7 @@ def _seed_demo_dataset():
             user = User(
                 username=spec['username'],
                 email=spec['email'],
-                password=generate_password_hash(spec['password']),
+                password=hash_password(spec['password']),
                 role='user',
                 is_archived=False,
             )
@@ -415,8 +597,8 @@ def _seed_demo_dataset():
 
     db.session.flush()
     for user_id, days in touched_dates.items():
-        for day in days:
-            recalc_daily_summary(user_id, day)
+        refresh_daily_summaries(user_id, list(days))
+        refresh_tag_summaries(user_id, list(days))
 
 
 @app.before_first_request
@@ -434,7 +616,7 @@ def initialize_seed_data():
     # Ensure admin exists
     admin = User.query.filter_by(email='admin@fittrack.com').first()
     if not admin:
-        hashed_pw = generate_password_hash('SuperSecret123')
+        hashed_pw = hash_password('SuperSecret123')
         admin = User(
             username='FitAdmin',
             email='admin@fittrack.com',
@@ -466,6 +648,370 @@ def initialize_seed_data():
         raise RuntimeError('Failed to initialize seed data. Apply migrations and retry.') from exc
 
 # -------------------- HELPERS --------------------
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+public_stats_cache = TTLCache(
+    max_entries=app.config['PUBLIC_STATS_CACHE_SIZE'],
+    ttl=app.config['PUBLIC_STATS_CACHE_TTL'],
+)
+
+
+class EventBus:
+    """In-process publish/subscribe hub feeding the /events SSE streams."""
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            for channel in channels:
+                self._channels.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            for channel, subscribers in list(self._channels.items()):
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def publish(self, channels, event):
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets.update(self._channels.get(channel, ()))
+        for subscriber in targets:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A stalled stream gets one resync instead of an unbounded backlog.
+                # Swapped under the queue's own mutex so a concurrent publisher
+                # can't refill it in between and raise Full out of a write.
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                    subscriber.queue.append({'type': 'resync'})
+                    subscriber.not_empty.notify()
+
+
+class BackgroundJobRunner:
+    """Single daemon thread that runs queued jobs one at a time in an app context."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='background-jobs', daemon=True)
+                self._thread.start()
+        self._queue.put((func, args))
+
+    def join(self):
+        """Block until every submitted job has finished."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            func, args = self._queue.get()
+            try:
+                with app.app_context():
+                    try:
+                        func(*args)
+                    finally:
+                        db.session.remove()
+            except Exception:
+                app.logger.exception('Background job %s failed', getattr(func, '__name__', func))
+            finally:
+                self._queue.task_done()
+
+
+class MemoryCounterStore:
+    """Per-process counters that expire a fixed time after their first hit."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def incr(self, key, ttl):
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._entries.get(key, (0, 0))
+            if expires_at <= now:
+                count, expires_at = 0, now + ttl
+            self._entries[key] = (count + 1, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return count + 1
+
+    def reset(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCounterStore:
+    """Counters shared by every worker through a Redis-compatible server."""
+
+    def __init__(self, url, prefix='fittrack:login-failures:'):
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def incr(self, key, ttl):
+        name = f'{self.prefix}{key}'
+        try:
+            # SET NX EX creates the key with its TTL in one step (a no-op when
+            # it exists), so no crash can leave a counter that never expires.
+            pipe = self._client.pipeline(transaction=True)
+            pipe.set(name, 0, ex=ttl, nx=True)
+            pipe.incr(name)
+            _, count = pipe.execute()
+            return count
+        except redis.RedisError:
+            # Fail open: an unreachable store must not take logins down with it.
+            app.logger.exception('Login failure store unavailable')
+            return 0
+
+    def reset(self, key):
+        try:
+            self._client.delete(f'{self.prefix}{key}')
+        except redis.RedisError:
+            app.logger.exception('Login failure store unavailable')
+
+    def clear(self):
+        try:
+            names = list(self._client.scan_iter(match=f'{self.prefix}*'))
+            if names:
+                self._client.delete(*names)
+        except redis.RedisError:
+            app.logger.exception('Login failure store unavailable')
+
+
+def make_counter_store(url, max_entries):
+    if not url or url == 'memory':
+        return MemoryCounterStore(max_entries)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        if redis is None:
+            raise RuntimeError('A redis:// LOGIN_FAILURE_STORE needs the redis package (pip install redis).')
+        return RedisCounterStore(url)
+    raise RuntimeError('LOGIN_FAILURE_STORE must be "memory" or a redis:// URL.')
+
+
+class TokenBucketLimiter:
+    """Per-process token buckets, one small (tokens, stamp) pair per active key.
+
+    Buckets refill continuously at ``capacity / period`` tokens per second; the
+    least recently used keys are dropped beyond ``max_keys`` (a dropped key
+    simply starts again with a full bucket).
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, keys, capacity, period):
+        """Take one token from every bucket in ``keys``, or none of them.
+
+        Returns 0 when the request may proceed, otherwise the seconds until
+        every bucket holds a token again.
+        """
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            for key in keys:
+                tokens, stamp = self._buckets.get(key, (capacity, now))
+                levels.append(min(capacity, tokens + (now - stamp) * rate))
+            wait = max((1 - tokens) / rate for tokens in levels)
+            if wait <= 0:
+                levels = [tokens - 1 for tokens in levels]
+            for key, tokens in zip(keys, levels):
+                self._buckets[key] = (tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return max(wait, 0)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+event_bus = EventBus(queue_size=app.config['EVENT_QUEUE_SIZE'])
+login_failures = make_counter_store(app.config['LOGIN_FAILURE_STORE'], app.config['LOGIN_FAILURE_STORE_SIZE'])
+rate_limiter = TokenBucketLimiter(max_keys=app.config['RATE_LIMIT_MAX_KEYS'])
+background_jobs = BackgroundJobRunner()
+identity_cache = TTLCache(
+    max_entries=app.config['IDENTITY_CACHE_SIZE'],
+    ttl=app.config['IDENTITY_CACHE_TTL'],
+)
+tag_id_cache = TTLCache(
+    max_entries=app.config['TAG_CACHE_SIZE'],
+    ttl=app.config['TAG_CACHE_TTL'],
+)
+
+
+def load_session_identity(user_id):
+    # Slim (id, role, is_archived, username) row for the per-request session
+    # check; admin archive/restore/delete evict it via invalidate_identity.
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        identity = db.session.query(
+            User.id,
+            User.role,
+            User.is_archived,
+            User.username,
+        ).filter(User.id == user_id).first()
+        if identity is not None:
+            identity_cache.set(user_id, identity)
+    return identity
+
+
+def invalidate_identity(user_id):
+    identity_cache.pop(user_id)
+
+
+def session_identity_allows(identity, role):
+    return bool(
+        identity
+        and identity.role == role
+        and not (role == 'user' and identity.is_archived)
+    )
+
+
+def _session_username():
+    identity = g.get('session_identity')
+    return identity.username if identity else None
+
+
+def _event_channels(user_id):
+    return ('admin', f'user:{user_id}') if user_id is not None else ('admin',)
+
+
+def _relay_signature(payload):
+    return hmac.new(app.config['SECRET_KEY'].encode(), payload, hashlib.sha256).hexdigest().encode()
+
+
+def encode_relay_event(channels, event):
+    payload = json.dumps({'channels': list(channels), 'event': event}, separators=(',', ':')).encode()
+    return _relay_signature(payload) + b'.' + payload
+
+
+def decode_relay_event(datagram):
+    signature, _, payload = datagram.partition(b'.')
+    if not hmac.compare_digest(signature, _relay_signature(payload)):
+        return None
+    try:
+        message = json.loads(payload)
+        return tuple(message['channels']), message['event']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def parse_relay_address(value):
+    host, _, port = (value or '').rpartition(':')
+    if not host or not port.isdigit():
+        return None
+    return host, int(port)
+
+
+_relay_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+_relay_address = parse_relay_address(app.config.get('EVENT_RELAY_ADDR'))
+
+
+def relay_event(channels, event):
+    # Fire-and-forget hand-off to sse_server.py; a lost datagram only
+    # delays a dashboard refresh until the next change.
+    if not _relay_address:
+        return
+    try:
+        _relay_socket.sendto(encode_relay_event(channels, event), _relay_address)
+    except OSError:
+        pass
+
+
+def make_etag(*parts):
+    return hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()[:40]
+
+
+def not_modified_response(etag):
+    if etag not in request.if_none_match:
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def payload_etag(kind, payload):
+    # For responses already held in a cache: hashing the payload gives every
+    # worker the same validator for the same data.
+    return make_etag(kind, json.dumps(payload, sort_keys=True, separators=(',', ':')))
+
+
+def etagged_json(payload, etag):
+    not_modified = not_modified_response(etag)
+    if not_modified is not None:
+        return not_modified
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
+
+def _mark_data_changed(user_id=None, event_type='data_changed'):
+    # Called after a committed write that can change dashboard aggregates.
+    public_stats_cache.clear()
+    channels = _event_channels(user_id)
+    event = {'type': event_type, 'user_id': user_id}
+    event_bus.publish(channels, event)
+    relay_event(channels, event)
+
 def normalize_tags(raw):
     if not raw:
         return []
@@ -489,44 +1035,435 @@ def normalize_tags(raw):
         result.append(name)
     return result
 
+def _locked_tag_ids(tag_names):
+    # A locking read sees tags committed by concurrent creators even when the
+    # transaction's snapshot predates them.
+    rows = db.session.execute(
+        select(ActivityTag.id, ActivityTag.name)
+        .where(ActivityTag.name.in_(tag_names))
+        .with_for_update(read=True)
+    )
+    return {name: tag_id for tag_id, name in rows}
+
+def resolve_tag_ids(tag_names):
+    """Map tag names to activity_tag ids, creating the missing ones."""
+    ids = {}
+    missing = []
+    for name in tag_names:
+        tag_id = tag_id_cache.get(name)
+        if tag_id is None:
+            missing.append(name)
+        else:
+            ids[name] = tag_id
+    if not missing:
+        return ids
+
+    # Plain read first: a locking read that finds nothing takes gap locks,
+    # and two creators holding the same gap deadlock on their inserts.
+    existing = set(db.session.execute(
+        select(ActivityTag.name).where(ActivityTag.name.in_(missing))
+    ).scalars())
+    new_names = [name for name in missing if name not in existing]
+    if new_names:
+        # IGNORE lets concurrent creators of the same name converge on one
+        # row instead of failing on the unique key.
+        db.session.execute(
+            mysql_insert(ActivityTag.__table__).prefix_with('IGNORE'),
+            [{'name': name} for name in new_names],
+        )
+    # Every name now has a row, so this only takes record locks.
+    found = _locked_tag_ids(missing)
+    ids.update(found)
+    # Cached only once the transaction commits, so a rollback can never leave
+    # the cache pointing at a tag row that no longer exists.
+    db.session.info.setdefault('pending_tag_ids', {}).update(found)
+    return ids
+
+@event.listens_for(db.session, 'after_commit')
+def _cache_committed_tag_ids(session):
+    for name, tag_id in session.info.pop('pending_tag_ids', {}).items():
+        tag_id_cache.set(name, tag_id)
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_uncommitted_tag_ids(session):
+    session.info.pop('pending_tag_ids', None)
+
+def link_workout_tags(links):
+    # links: iterable of (workout_id, tag_id) pairs, written in one INSERT.
+    rows = [{'workout_id': workout_id, 'tag_id': tag_id} for workout_id, tag_id in links]
+    if rows:
+        db.session.execute(insert(workout_tag), rows)
+
 def get_or_create_tags(tag_names):
     if not tag_names:
         return []
-    existing = ActivityTag.query.filter(ActivityTag.name.in_(tag_names)).all()
-    by_name = {t.name: t for t in existing}
-    for name in tag_names:
-        if name not in by_name:
-            tag = ActivityTag(name=name)
-            db.session.add(tag)
-            by_name[name] = tag
-    return [by_name[name] for name in tag_names]
-
-def recalc_daily_summary(user_id, summary_date):
-    totals = db.session.query(
+    ids = resolve_tag_ids(tag_names)
+    by_id = {
+        tag.id: tag
+        for tag in ActivityTag.query.filter(ActivityTag.id.in_(ids.values())).with_for_update(read=True)
+    }
+    return [by_id[ids[name]] for name in tag_names]
+
+def _parse_workout_fields(data):
+    activity = _clean_text(str(data.get('activity') or ''), 100)
+    try:
+        duration = int(data.get('duration', 0))
+        calories = int(data.get('calories', 0))
+    except (TypeError, ValueError):
+        return None, 'invalid'
+    date_str = _clean_text(str(data.get('date') or ''), 20)
+    if not _is_valid_activity(activity) or duration <= 0 or calories <= 0 or not date_str:
+        return None, 'invalid'
+    if duration > 1440 or calories > 20000:
+        return None, 'out_of_range'
+    try:
+        y, m, d = map(int, date_str.split('-'))
+        workout_date = date(y, m, d)
+    except Exception:
+        return None, 'invalid_date'
+    if workout_date > date.today() or workout_date < date(2000, 1, 1):
+        return None, 'invalid_date_range'
+    return {
+        'activity': activity,
+        'duration': duration,
+        'calories': calories,
+        'date': workout_date,
+    }, None
+
+def bump_data_version(user_id):
+    # The UPDATE row-locks the user until commit, so one user's versions are
+    # handed out in commit order and a since= token never skips a change.
+    db.session.execute(
+        update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+    )
+    return db.session.query(User.data_version).filter(User.id == user_id).scalar()
+
+
+def current_data_version(user_id):
+    return db.session.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+
+def touch_data_version(user):
+    # For changes to the user row itself (archive, avatar), which have no
+    # workout to stamp but must still move users_data_validator.
+    user.data_version = User.data_version + 1
+
+
+def users_data_validator():
+    # Every write bumps its user's data_version and versions only grow, so
+    # the sum moves on any change; count and max id catch sign-ups and
+    # deletions. One pass over the user table, no workout reads.
+    return db.session.query(
+        func.count(User.id),
+        func.coalesce(func.sum(User.data_version), 0),
+        func.max(User.id),
+    ).one()
+
+
+def add_workout_tombstones(user_id, workout_ids, change_version):
+    if not workout_ids:
+        return
+    db.session.execute(insert(WorkoutTombstone), [
+        {'user_id': user_id, 'workout_id': workout_id, 'change_version': change_version}
+        for workout_id in workout_ids
+    ])
+
+
+def _insert_workout_batch(user_id, username, batch, change_version, inserted_before):
+    # One multi-row INSERT per batch. change_version was bumped for this
+    # import (holding the user's version row), so the import's rows are the
+    # only ones carrying it; with ids ascending in insert order, the batch's
+    # ids come back from one select skipping the rows of earlier batches.
+    db.session.execute(insert(Workout), [
+        dict(fields, user_id=user_id, username=username, archived=False, change_version=change_version)
+        for fields, _ in batch
+    ])
+    tag_names = normalize_tags([name for _, names in batch for name in names])
+    if not tag_names:
+        return
+    tag_ids = resolve_tag_ids(tag_names)
+    inserted = db.session.execute(
+        select(Workout.id, Workout.date, Workout.calories, Workout.duration)
+        .where(Workout.user_id == user_id, Workout.change_version == change_version)
+        .order_by(Workout.id)
+        .offset(inserted_before)
+        .limit(len(batch))
+    ).all()
+    tag_ids_by_workout = {
+        row.id: [tag_ids[name] for name in names]
+        for row, (_, names) in zip(inserted, batch) if names
+    }
+    link_workout_tags((workout_id, tag_id) for workout_id, ids in tag_ids_by_workout.items() for tag_id in ids)
+    apply_tag_summary_deltas(user_id, inserted, 1, tag_ids_by_workout)
+
+def _load_workout_tags(workout_ids):
+    if not workout_ids:
+        return {}
+    rows = db.session.query(
+        workout_tag.c.workout_id,
+        ActivityTag.name,
+    ).join(
+        ActivityTag, ActivityTag.id == workout_tag.c.tag_id
+    ).filter(
+        workout_tag.c.workout_id.in_(workout_ids)
+    ).order_by(
+        workout_tag.c.workout_id, ActivityTag.name
+    ).all()
+    tags_by_workout = {}
+    for workout_id, name in rows:
+        tags_by_workout.setdefault(workout_id, []).append(name)
+    return tags_by_workout
+
+def _iter_workout_chunks(user_id, archived=False, chunk_size=EXPORT_CHUNK_SIZE):
+    # Keyset pagination on (date, id): every chunk is an index range scan and
+    # only plain row tuples are held, so memory stays flat for long histories.
+    last_key = None
+    while True:
+        query = db.session.query(
+            Workout.id,
+            Workout.date,
+            Workout.activity,
+            Workout.duration,
+            Workout.calories,
+        ).filter(
+            Workout.user_id == user_id,
+            Workout.archived.is_(archived),
+        )
+        if last_key:
+            last_date, last_id = last_key
+            query = query.filter(or_(
+                Workout.date > last_date,
+                and_(Workout.date == last_date, Workout.id > last_id),
+            ))
+        rows = query.order_by(Workout.date, Workout.id).limit(chunk_size).all()
+        if not rows:
+            return
+        tags_by_workout = _load_workout_tags([row.id for row in rows])
+        yield [(row, tags_by_workout.get(row.id, [])) for row in rows]
+        if len(rows) < chunk_size:
+            return
+        last_key = (rows[-1].date, rows[-1].id)
+
+def refresh_daily_summaries(user_id, summary_dates):
+    # Recompute the given days from Workout in one grouped upsert, then drop
+    # the days left without active workouts. summary_dates may be a list or a
+    # select of dates, so callers never have to materialize the touched rows.
+    summary_table = DailySummary.__table__
+    source = select(
+        Workout.user_id,
+        func.max(Workout.username),
+        Workout.date,
         func.count(Workout.id),
         func.sum(Workout.calories),
-        func.sum(Workout.duration)
-    ).filter_by(user_id=user_id, archived=False, date=summary_date).first()
+        func.sum(Workout.duration),
+    ).where(
+        Workout.user_id == user_id,
+        Workout.archived.is_(False),
+        Workout.date.in_(summary_dates),
+    ).group_by(Workout.user_id, Workout.date)
+    stmt = mysql_insert(summary_table).from_select(
+        [
+            'user_id',
+            'username',
+            'summary_date',
+            'total_workouts',
+            'total_calories',
+            'total_duration',
+        ],
+        source,
+    )
+    stmt = stmt.on_duplicate_key_update(
+        username=stmt.inserted.username,
+        total_workouts=stmt.inserted.total_workouts,
+        total_calories=stmt.inserted.total_calories,
+        total_duration=stmt.inserted.total_duration,
+    )
+    db.session.execute(stmt)
 
-    total_workouts = int(totals[0] or 0)
-    total_calories = int(totals[1] or 0)
-    total_duration = int(totals[2] or 0)
+    active_day = exists().where(
+        Workout.user_id == user_id,
+        Workout.archived.is_(False),
+        Workout.date == summary_table.c.summary_date,
+    )
+    db.session.execute(
+        delete(summary_table).where(
+            summary_table.c.user_id == user_id,
+            summary_table.c.summary_date.in_(summary_dates),
+            ~active_day,
+        )
+    )
 
-    summary = DailySummary.query.filter_by(user_id=user_id, summary_date=summary_date).first()
-    user = db.session.get(User, user_id)
-    username = user.username if user else None
-    if total_workouts == 0:
-        if summary:
-            db.session.delete(summary)
+def apply_daily_summary_deltas(user_id, deltas, username=None):
+    # deltas maps summary_date -> (workouts, calories, duration) increments.
+    # A single INSERT ... ON DUPLICATE KEY UPDATE applies them atomically, so
+    # writers never re-aggregate the day or race on creating the row.
+    rows = [
+        {
+            'user_id': user_id,
+            'username': username,
+            'summary_date': summary_date,
+            'total_workouts': workouts,
+            'total_calories': calories,
+            'total_duration': duration,
+        }
+        for summary_date, (workouts, calories, duration) in deltas.items()
+        if workouts or calories or duration
+    ]
+    if not rows:
+        return
+    summary_table = DailySummary.__table__
+    stmt = mysql_insert(summary_table).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        total_workouts=summary_table.c.total_workouts + stmt.inserted.total_workouts,
+        total_calories=summary_table.c.total_calories + stmt.inserted.total_calories,
+        total_duration=summary_table.c.total_duration + stmt.inserted.total_duration,
+    )
+    db.session.execute(stmt)
+
+    emptied_dates = [row['summary_date'] for row in rows if row['total_workouts'] < 0]
+    if emptied_dates:
+        db.session.execute(
+            delete(summary_table).where(
+                summary_table.c.user_id == user_id,
+                summary_table.c.summary_date.in_(emptied_dates),
+                summary_table.c.total_workouts <= 0,
+            )
+        )
+
+def apply_workout_summary_delta(workout, sign):
+    apply_daily_summary_deltas(
+        workout.user_id,
+        {workout.date: (sign, sign * workout.calories, sign * workout.duration)},
+        username=workout.username,
+    )
+
+def rebuild_daily_summaries(user_id=None):
+    # Reconcile path: drop and regenerate summaries from Workout in two
+    # set-based statements instead of one aggregate per day.
+    summary_table = DailySummary.__table__
+    clear_stmt = delete(summary_table)
+    source = db.session.query(
+        Workout.user_id,
+        func.max(Workout.username),
+        Workout.date,
+        func.count(Workout.id),
+        func.sum(Workout.calories),
+        func.sum(Workout.duration),
+    ).filter(Workout.archived.is_(False))
+    if user_id is not None:
+        clear_stmt = clear_stmt.where(summary_table.c.user_id == user_id)
+        source = source.filter(Workout.user_id == user_id)
+    source = source.group_by(Workout.user_id, Workout.date)
+
+    db.session.execute(clear_stmt)
+    result = db.session.execute(
+        insert(summary_table).from_select(
+            [
+                'user_id',
+                'username',
+                'summary_date',
+                'total_workouts',
+                'total_calories',
+                'total_duration',
+            ],
+            source.statement,
+        )
+    )
+    return result.rowcount
+
+def _load_workout_tag_ids(workout_ids):
+    if not workout_ids:
+        return {}
+    rows = db.session.execute(
+        select(workout_tag.c.workout_id, workout_tag.c.tag_id).where(workout_tag.c.workout_id.in_(workout_ids))
+    )
+    tag_ids_by_workout = {}
+    for workout_id, tag_id in rows:
+        tag_ids_by_workout.setdefault(workout_id, []).append(tag_id)
+    return tag_ids_by_workout
+
+def apply_tag_summary_deltas(user_id, workouts, sign, tag_ids_by_workout=None):
+    # Same upsert-and-prune scheme as apply_daily_summary_deltas, one row per
+    # (day, tag). Must run before the workouts' workout_tag links are removed.
+    if tag_ids_by_workout is None:
+        tag_ids_by_workout = _load_workout_tag_ids([w.id for w in workouts])
+    deltas = {}
+    for w in workouts:
+        for tag_id in tag_ids_by_workout.get(w.id, ()):
+            workouts_delta, calories, duration = deltas.get((w.date, tag_id), (0, 0, 0))
+            deltas[(w.date, tag_id)] = (workouts_delta + sign, calories + sign * w.calories, duration + sign * w.duration)
+    if not deltas:
         return
-    if not summary:
-        summary = DailySummary(user_id=user_id, username=username, summary_date=summary_date)
-        db.session.add(summary)
-    elif username and summary.username != username:
-        summary.username = username
-    summary.total_workouts = total_workouts
-    summary.total_calories = total_calories
-    summary.total_duration = total_duration
+    summary_table = TagDailySummary.__table__
+    stmt = mysql_insert(summary_table).values([
+        {
+            'user_id': user_id,
+            'tag_id': tag_id,
+            'summary_date': summary_date,
+            'total_workouts': workouts_delta,
+            'total_calories': calories,
+            'total_duration': duration,
+        }
+        for (summary_date, tag_id), (workouts_delta, calories, duration) in deltas.items()
+    ])
+    stmt = stmt.on_duplicate_key_update(
+        total_workouts=summary_table.c.total_workouts + stmt.inserted.total_workouts,
+        total_calories=summary_table.c.total_calories + stmt.inserted.total_calories,
+        total_duration=summary_table.c.total_duration + stmt.inserted.total_duration,
+    )
+    db.session.execute(stmt)
+    if sign < 0:
+        db.session.execute(
+            delete(summary_table).where(
+                summary_table.c.user_id == user_id,
+                summary_table.c.summary_date.in_({summary_date for summary_date, _ in deltas}),
+                summary_table.c.total_workouts <= 0,
+            )
+        )
+
+def _tag_summary_source(user_id=None, summary_dates=None):
+    source = select(
+        Workout.user_id,
+        workout_tag.c.tag_id,
+        Workout.date,
+        func.count(Workout.id),
+        func.sum(Workout.calories),
+        func.sum(Workout.duration),
+    ).join(
+        workout_tag, workout_tag.c.workout_id == Workout.id
+    ).where(Workout.archived.is_(False))
+    if user_id is not None:
+        source = source.where(Workout.user_id == user_id)
+    if summary_dates is not None:
+        source = source.where(Workout.date.in_(summary_dates))
+    return source.group_by(Workout.user_id, workout_tag.c.tag_id, Workout.date)
+
+TAG_SUMMARY_COLUMNS = ['user_id', 'tag_id', 'summary_date', 'total_workouts', 'total_calories', 'total_duration']
+
+def refresh_tag_summaries(user_id, summary_dates):
+    # Tag counterpart of refresh_daily_summaries: replace the given days'
+    # rows with a fresh grouped aggregate.
+    summary_table = TagDailySummary.__table__
+    db.session.execute(
+        delete(summary_table).where(
+            summary_table.c.user_id == user_id,
+            summary_table.c.summary_date.in_(summary_dates),
+        )
+    )
+    db.session.execute(
+        insert(summary_table).from_select(TAG_SUMMARY_COLUMNS, _tag_summary_source(user_id, summary_dates))
+    )
+
+def rebuild_tag_summaries(user_id=None):
+    summary_table = TagDailySummary.__table__
+    clear_stmt = delete(summary_table)
+    if user_id is not None:
+        clear_stmt = clear_stmt.where(summary_table.c.user_id == user_id)
+    db.session.execute(clear_stmt)
+    result = db.session.execute(
+        insert(summary_table).from_select(TAG_SUMMARY_COLUMNS, _tag_summary_source(user_id))
+    )
+    return result.rowcount
 
 def log_admin_action(action, target_user_id=None, meta=None):
     if session.get('role') != 'admin':
@@ -541,6 +1478,7 @@ def log_admin_action(action, target_user_id=None, meta=None):
         details=details
     )
     db.session.add(entry)
+    return entry
 
 def log_import_export(user_id, action, file_format, records=0, filename=None, status='ok', error_message=None):
     user = db.session.get(User, user_id)
@@ -621,67 +1559,423 @@ def _build_admin_user_stats(users):
             'avg_cal': aggregate['avg_cal'],
             'avg_dur': aggregate['avg_dur'],
             'freq_activity': frequent_map.get(user.id, '-'),
-            'avatar_url': user.avatar_url,
+            'avatar_url': avatar_url_for(user.avatar_hash),
         })
     return stats
 
 
-def _get_admin_dashboard_payload():
-    users_all = User.query.filter(User.role != 'admin').all()
-    users = [u for u in users_all if not u.is_archived]
-    archived_users = [u for u in users_all if u.is_archived]
-    total_workouts = Workout.query.count()
-    avg_calories = db.session.query(func.avg(Workout.calories)).scalar() or 0
-    today = date.today()
-
-    today_workouts = (
-        Workout.query.filter(
+def _summary_coverage_split(date_from, date_to):
+    # Daily summaries are authoritative from DAILY_SUMMARY_COVERED_FROM on
+    # (everything when unset); earlier days fall back to scanning workouts.
+    covered_from = app.config.get('DAILY_SUMMARY_COVERED_FROM')
+    if not covered_from or covered_from <= date_from:
+        return None, (date_from, date_to)
+    if covered_from > date_to:
+        return (date_from, date_to), None
+    return (date_from, covered_from - timedelta(days=1)), (covered_from, date_to)
+
+
+def _daily_totals(date_from, date_to, user_id=None):
+    """Return {date: (workouts, calories, duration)} for active workouts."""
+    raw_range, summary_range = _summary_coverage_split(date_from, date_to)
+    queries = []
+    if raw_range:
+        raw_query = db.session.query(
+            Workout.date,
+            func.count(Workout.id),
+            func.sum(Workout.calories),
+            func.sum(Workout.duration),
+        ).filter(
             Workout.archived.is_(False),
-            Workout.date == today,
-        ).count()
-    )
-    today_calories = (
-        db.session.query(func.sum(Workout.calories))
-        .filter(
-            Workout.archived.is_(False),
-            Workout.date == today,
+            Workout.date >= raw_range[0],
+            Workout.date <= raw_range[1],
         )
-        .scalar()
-    ) or 0
-    today_avg_calories = (
-        db.session.query(func.avg(Workout.calories))
-        .filter(
+        if user_id is not None:
+            raw_query = raw_query.filter(Workout.user_id == user_id)
+        queries.append(raw_query.group_by(Workout.date))
+    if summary_range:
+        summary_query = db.session.query(
+            DailySummary.summary_date,
+            func.sum(DailySummary.total_workouts),
+            func.sum(DailySummary.total_calories),
+            func.sum(DailySummary.total_duration),
+        ).filter(
+            DailySummary.summary_date >= summary_range[0],
+            DailySummary.summary_date <= summary_range[1],
+        )
+        if user_id is not None:
+            summary_query = summary_query.filter(DailySummary.user_id == user_id)
+        queries.append(summary_query.group_by(DailySummary.summary_date))
+
+    totals = {}
+    for query in queries:
+        for day, workouts, calories, duration in query.all():
+            totals[day] = (int(workouts or 0), int(calories or 0), int(duration or 0))
+    return totals
+
+
+def _earliest_active_workout_date(user_id=None):
+    covered_from = app.config.get('DAILY_SUMMARY_COVERED_FROM')
+    if covered_from:
+        raw_query = db.session.query(func.min(Workout.date)).filter(
             Workout.archived.is_(False),
-            Workout.date == today,
+            Workout.date < covered_from,
+        )
+        if user_id is not None:
+            raw_query = raw_query.filter(Workout.user_id == user_id)
+        earliest = raw_query.scalar()
+        if earliest:
+            return earliest
+    summary_query = db.session.query(func.min(DailySummary.summary_date))
+    if user_id is not None:
+        summary_query = summary_query.filter(DailySummary.user_id == user_id)
+    return summary_query.scalar()
+
+
+def _decode_avatar_data_url(data_url):
+    header, _, encoded = (data_url or '').partition(';base64,')
+    mimetype = header[len('data:'):] if header.startswith('data:') else ''
+    if mimetype not in AVATAR_MIMETYPES or not encoded:
+        return None, None
+    try:
+        return mimetype, base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        return None, None
+
+
+def store_avatar(mimetype, image):
+    # Identical uploads share one row; the hash doubles as the ETag.
+    avatar_hash = hashlib.sha256(image).hexdigest()
+    stmt = mysql_insert(Avatar).values(
+        hash=avatar_hash,
+        mimetype=mimetype,
+        data=image,
+    ).prefix_with('IGNORE')
+    db.session.execute(stmt)
+    return avatar_hash
+
+
+def release_avatar(avatar_hash):
+    # Drop the blob once no user points at it any more, in one statement so
+    # a concurrent upload re-using the hash can't slip in between the check
+    # and the delete.
+    if not avatar_hash:
+        return
+    db.session.execute(
+        delete(Avatar).where(
+            Avatar.hash == avatar_hash,
+            ~exists().where(User.avatar_hash == avatar_hash),
         )
-        .scalar()
-    ) or 0
-    today_active_users = (
-        db.session.query(func.count(func.distinct(Workout.user_id)))
-        .join(User, User.id == Workout.user_id)
-        .filter(
+    )
+
+
+def avatar_url_for(avatar_hash):
+    if not avatar_hash:
+        return None
+    return url_for('avatar_image', avatar_hash=avatar_hash)
+
+
+def _today_snapshot(today):
+    # One conditional aggregate: totals over every workout logged today plus
+    # the distinct count of visible (non-admin, non-archived) users.
+    counts_user = and_(User.role != 'admin', User.is_archived.is_(False))
+    raw_range, _ = _summary_coverage_split(today, today)
+    if raw_range:
+        row = db.session.query(
+            func.count(Workout.id),
+            func.sum(Workout.calories),
+            func.count(func.distinct(case((counts_user, Workout.user_id)))),
+        ).join(
+            User, User.id == Workout.user_id
+        ).filter(
             Workout.archived.is_(False),
             Workout.date == today,
-            User.role != 'admin',
-            User.is_archived.is_(False),
+        ).one()
+    else:
+        row = db.session.query(
+            func.sum(DailySummary.total_workouts),
+            func.sum(DailySummary.total_calories),
+            func.count(func.distinct(case((counts_user, DailySummary.user_id)))),
+        ).join(
+            User, User.id == DailySummary.user_id
+        ).filter(
+            DailySummary.summary_date == today,
+        ).one()
+
+    workouts = int(row[0] or 0)
+    calories = int(row[1] or 0)
+    return {
+        'date_iso': today.isoformat(),
+        'active_users': int(row[2] or 0),
+        'workouts': workouts,
+        'calories': calories,
+        'avg_calories': int(round(calories / workouts)) if workouts else 0,
+    }
+
+
+def _admin_user_page(archived, search, sort, page, limit):
+    # Filtering, ordering and paging all happen in SQL; only the page's
+    # users are handed to _build_admin_user_stats for full aggregation.
+    query = db.session.query(
+        User.id,
+        User.username,
+        User.email,
+        User.is_archived,
+        User.avatar_hash,
+    ).filter(
+        User.role != 'admin',
+        User.is_archived.is_(archived),
+    )
+    if search:
+        pattern = '%' + re.sub(r'([\\%_])', r'\\\1', search) + '%'
+        query = query.filter(or_(
+            User.username.ilike(pattern, escape='\\'),
+            User.email.ilike(pattern, escape='\\'),
+        ))
+    total = query.order_by(None).count()
+
+    if sort in ('active_desc', 'archived_desc', 'avg_cal_desc'):
+        # Correlated per user, so only the filtered users' workouts are read
+        # (the counts straight from idx_workout_user_archived).
+        if sort == 'avg_cal_desc':
+            sort_key = select(func.avg(Workout.calories)).where(Workout.user_id == User.id)
+        else:
+            sort_key = select(func.count(Workout.id)).where(
+                Workout.user_id == User.id,
+                Workout.archived.is_(sort == 'archived_desc'),
+            )
+        query = query.order_by(
+            func.coalesce(sort_key.correlate(User).scalar_subquery(), 0).desc(),
+            User.username.asc(),
         )
-        .scalar()
-    ) or 0
+    elif sort == 'username_desc':
+        query = query.order_by(User.username.desc())
+    else:
+        query = query.order_by(User.username.asc())
+
+    rows = query.order_by(User.id.asc()).offset((page - 1) * limit).limit(limit).all()
+    return rows, total
+
+
+def _get_admin_dashboard_payload(page=1, limit=ADMIN_USERS_PAGE_SIZE, sort='username_asc', search='', status='all'):
+    active_total_all, archived_total_all = db.session.query(
+        func.sum(case((User.is_archived.is_(False), 1), else_=0)),
+        func.sum(case((User.is_archived.is_(True), 1), else_=0)),
+    ).filter(User.role != 'admin').one()
+
+    users, active_total = [], 0
+    if status != 'archived':
+        users, active_total = _admin_user_page(False, search, sort, page, limit)
+    archived_rows, archived_total = [], 0
+    if status != 'active':
+        archived_rows, archived_total = _admin_user_page(True, search, sort, page, limit)
+    archived_users = [{
+        'id': u.id,
+        'username': u.username,
+        'email': u.email,
+        'avatar_url': avatar_url_for(u.avatar_hash),
+    } for u in archived_rows]
+
+    total_workouts, avg_calories = db.session.query(
+        func.count(Workout.id),
+        func.avg(Workout.calories),
+    ).one()
 
     return {
-        'total_users': len(users),
-        'total_workouts': total_workouts,
+        'total_users': int(active_total_all or 0),
+        'total_archived_users': int(archived_total_all or 0),
+        'total_workouts': int(total_workouts or 0),
         'avg_calories': int(round(avg_calories)) if avg_calories else 0,
-        'today_snapshot': {
-            'date_iso': today.isoformat(),
-            'active_users': int(today_active_users),
-            'workouts': int(today_workouts),
-            'calories': int(today_calories),
-            'avg_calories': int(round(today_avg_calories)) if today_avg_calories else 0,
-        },
+        'today_snapshot': _today_snapshot(date.today()),
         'user_stats': _build_admin_user_stats(users),
         'archived_users': archived_users,
+        'pagination': {
+            'page': page,
+            'limit': limit,
+            'active_total': active_total,
+            'archived_total': archived_total,
+            'pages': max(1, -(-max(active_total, archived_total) // limit)),
+        },
+    }
+
+
+def _parse_iso_date(value):
+    try:
+        return date.fromisoformat((value or '').strip())
+    except ValueError:
+        return None
+
+
+def _parse_workout_cursor(value):
+    # Cursor format: "<YYYY-MM-DD>:<workout id>" of the last row already sent.
+    date_part, _, id_part = (value or '').partition(':')
+    cursor_date = _parse_iso_date(date_part)
+    if not cursor_date or not id_part.isdigit():
+        return None
+    return cursor_date, int(id_part)
+
+
+def _workout_item(row, tags):
+    return {
+        'id': row.id,
+        'activity': row.activity,
+        'duration': row.duration,
+        'calories': row.calories,
+        'date': row.date.isoformat(),
+        'tags': tags,
     }
+
+
+def _workout_changes_response(user_id, since, sync_version):
+    rows = db.session.query(
+        Workout.id,
+        Workout.activity,
+        Workout.duration,
+        Workout.calories,
+        Workout.date,
+        Workout.archived,
+    ).filter(
+        Workout.user_id == user_id,
+        Workout.change_version > since,
+    ).order_by(Workout.id).all()
+    deleted = [workout_id for (workout_id,) in db.session.query(WorkoutTombstone.workout_id).filter(
+        WorkoutTombstone.user_id == user_id,
+        WorkoutTombstone.change_version > since,
+    ).order_by(WorkoutTombstone.workout_id)]
+
+    tags_by_workout = _load_workout_tags([w.id for w in rows])
+    changed = [
+        dict(_workout_item(w, tags_by_workout.get(w.id, [])), archived=bool(w.archived))
+        for w in rows
+    ]
+    return jsonify({'changed': changed, 'deleted': deleted, 'sync_token': str(sync_version)})
+
+
+def _workout_listing_response(user_id):
+    args = request.args
+    # Read before the rows so a write racing this request is re-sent, not missed.
+    sync_version = current_data_version(user_id)
+    etag = make_etag('workouts', user_id, sync_version, request.query_string.decode())
+    not_modified = not_modified_response(etag)
+    if not_modified is not None:
+        return not_modified
+    reset = False
+    if args.get('since') is not None:
+        try:
+            since = int(args.get('since'))
+        except ValueError:
+            return jsonify({'error': 'invalid_since'}), 400
+        if since < 0:
+            return jsonify({'error': 'invalid_since'}), 400
+        if since <= sync_version:
+            response = _workout_changes_response(user_id, since, sync_version)
+            response.set_etag(etag)
+            return response
+        # A token from the future (e.g. a restored database) cannot be diffed.
+        reset = True
+
+    query = Workout.query.filter_by(user_id=user_id)
+
+    status = (args.get('status') or 'all').lower()
+    if status not in ('all', 'active', 'archived'):
+        return jsonify({'error': 'invalid_status'}), 400
+    if status != 'all':
+        query = query.filter(Workout.archived.is_(status == 'archived'))
+
+    date_from = _parse_iso_date(args.get('from')) if args.get('from') else None
+    date_to = _parse_iso_date(args.get('to')) if args.get('to') else None
+    if (args.get('from') and not date_from) or (args.get('to') and not date_to):
+        return jsonify({'error': 'invalid_date'}), 400
+    if date_from:
+        query = query.filter(Workout.date >= date_from)
+    if date_to:
+        query = query.filter(Workout.date <= date_to)
+
+    limit = None
+    if args.get('limit'):
+        try:
+            limit = int(args.get('limit'))
+        except ValueError:
+            return jsonify({'error': 'invalid_limit'}), 400
+        if limit < 1 or limit > MAX_WORKOUTS_PAGE_SIZE:
+            return jsonify({'error': 'invalid_limit'}), 400
+
+    if args.get('cursor'):
+        cursor = _parse_workout_cursor(args.get('cursor'))
+        if not cursor:
+            return jsonify({'error': 'invalid_cursor'}), 400
+        cursor_date, cursor_id = cursor
+        query = query.filter(or_(
+            Workout.date < cursor_date,
+            and_(Workout.date == cursor_date, Workout.id < cursor_id),
+        ))
+
+    query = query.with_entities(
+        Workout.id,
+        Workout.activity,
+        Workout.duration,
+        Workout.calories,
+        Workout.date,
+        Workout.archived,
+    ).order_by(Workout.date.desc(), Workout.id.desc())
+    workouts = query.limit(limit + 1).all() if limit else query.all()
+    next_cursor = None
+    if limit and len(workouts) > limit:
+        workouts = workouts[:limit]
+        next_cursor = f'{workouts[-1].date.isoformat()}:{workouts[-1].id}'
+
+    # One joined lookup for every tag on the page instead of a lazy load per row.
+    tags_by_workout = _load_workout_tags([w.id for w in workouts])
+    active = []
+    archived = []
+    for w in workouts:
+        item = _workout_item(w, tags_by_workout.get(w.id, []))
+        if w.archived:
+            archived.append(item)
+        else:
+            active.append(item)
+    payload = {
+        'active': active,
+        'archived': archived,
+        'next_cursor': next_cursor,
+        'sync_token': str(sync_version),
+    }
+    if reset:
+        payload['reset'] = True
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
+
+AUTH_FORM_TEMPLATES = {
+    'login': 'login.html',
+    'admin_login': 'admin-login.html',
+    'register': 'register.html',
+}
+
+
+def _shed_response(error, message, status, retry_after):
+    if _wants_json_response() or request.endpoint not in AUTH_FORM_TEMPLATES:
+        response = jsonify({'error': error})
+    else:
+        flash(message, 'warning')
+        response = app.make_response(render_template(AUTH_FORM_TEMPLATES[request.endpoint]))
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+@app.errorhandler(PasswordHashPoolBusy)
+def password_pool_busy(_exc):
+    # Shed load fast rather than queue a login burst behind the hash pool.
+    return _shed_response(
+        'server_busy',
+        'Sign-in is busy right now. Please try again in a moment.',
+        503,
+        app.config['PASSWORD_HASH_RETRY_AFTER'],
+    )
+
+
 # -------------------- ROUTES --------------------
 @app.route('/')
 def index():
@@ -702,14 +1996,14 @@ def login():
             flash(f'Too many failed attempts. Try again in {_lock_minutes_remaining(user)} minute(s).', 'warning')
             return redirect(url_for('login'))
 
-        if not user or not check_password_hash(user.password, password):
-            if user:
-                _register_login_failure(user)
+        if not user or not verify_password(user.password, password):
+            if _register_login_failure(user):
                 db.session.commit()
             flash('Incorrect email or password!', 'danger')
             return redirect(url_for('login'))
 
         _clear_login_failures(user)
+        _upgrade_password_hash(user, password)
         db.session.commit()
 
         if user.is_archived:
@@ -748,27 +2042,20 @@ def admin_login():
             flash(f'Too many failed attempts. Try again in {_lock_minutes_remaining(user)} minute(s).', 'warning')
             return redirect(url_for('admin_login'))
 
-        if email != 'admin@fittrack.com':
-            if user:
-                _register_login_failure(user)
-                db.session.commit()
-            flash('Incorrect admin email or password!', 'danger')
-            return redirect(url_for('admin_login'))
-        if admin_name != 'FitAdmin':
-            if user:
-                _register_login_failure(user)
-                db.session.commit()
-            flash('Incorrect admin email or password!', 'danger')
-            return redirect(url_for('admin_login'))
-
-        if not user or not check_password_hash(user.password, password):
-            if user:
-                _register_login_failure(user)
+        # Short-circuits so a wrong email or admin name never costs a hash.
+        if (
+            email != 'admin@fittrack.com'
+            or admin_name != 'FitAdmin'
+            or not user
+            or not verify_password(user.password, password)
+        ):
+            if _register_login_failure(user):
                 db.session.commit()
             flash('Incorrect admin email or password!', 'danger')
             return redirect(url_for('admin_login'))
 
         _clear_login_failures(user)
+        _upgrade_password_hash(user, password)
         db.session.commit()
         # Regenerate session on login to reduce fixation risk.
         session.clear()
@@ -849,7 +2136,7 @@ def register():
             flash('Email already registered!', 'warning')
             return redirect(url_for('register'))
 
-        hashed_pw = generate_password_hash(password)
+        hashed_pw = hash_password(password)
         user = User(
             username=username,
             email=email,
@@ -861,6 +2148,7 @@ def register():
         db.session.add(UserSettings(user_id=user.id, username=user.username))
         db.session.add(WeeklyGoal(user_id=user.id, username=user.username))
         db.session.commit()
+        _mark_data_changed(user.id, 'user_registered')
 
         flash('Registration successful! Please log in.', 'success')
         return redirect(url_for('login'))
@@ -893,6 +2181,7 @@ def admin_dashboard():
         today_snapshot=payload['today_snapshot'],
         user_stats=payload['user_stats'],
         archived_users=payload['archived_users'],
+        pagination=payload['pagination'],
     )
 
 @app.route('/admin/data')
@@ -900,7 +2189,29 @@ def admin_data():
     if session.get('role') != 'admin':
         return jsonify({'error': 'unauthorized'}), 401
 
-    payload = _get_admin_dashboard_payload()
+    args = request.args
+    try:
+        page = int(args.get('page') or 1)
+        limit = int(args.get('limit') or ADMIN_USERS_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'invalid_page'}), 400
+    if page < 1 or limit < 1 or limit > MAX_ADMIN_USERS_PAGE_SIZE:
+        return jsonify({'error': 'invalid_page'}), 400
+    sort = args.get('sort') or 'username_asc'
+    if sort not in ADMIN_USER_SORTS:
+        return jsonify({'error': 'invalid_sort'}), 400
+    status = args.get('status') or 'all'
+    if status not in ('all', 'active', 'archived'):
+        return jsonify({'error': 'invalid_status'}), 400
+    search = _clean_text(args.get('q'), 150)
+
+    # The today snapshot rolls over at midnight even without writes.
+    etag = make_etag('admin', *users_data_validator(), date.today().isoformat(), request.query_string.decode())
+    not_modified = not_modified_response(etag)
+    if not_modified is not None:
+        return not_modified
+
+    payload = _get_admin_dashboard_payload(page=page, limit=limit, sort=sort, search=search, status=status)
     user_stats = [{
         'id': item['id'],
         'username': item['username'],
@@ -913,69 +2224,60 @@ def admin_data():
         'avatar_url': item['avatar_url'],
     } for item in payload['user_stats']]
 
-    archived_stats = [{
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'avatar_url': user.avatar_url,
-    } for user in payload['archived_users']]
-
-    return jsonify({
+    body = {
         'total_users': payload['total_users'],
+        'total_archived_users': payload['total_archived_users'],
         'total_workouts': payload['total_workouts'],
         'avg_calories': payload['avg_calories'],
         'today_snapshot': payload['today_snapshot'],
         'user_stats': user_stats,
-        'archived_users': archived_stats,
-    })
+        'archived_users': payload['archived_users'],
+        'pagination': payload['pagination'],
+    }
+    return etagged_json(body, etag)
+
+def _requested_week_offset():
+    try:
+        week_offset = int((request.args.get('week_offset') or '0').strip())
+    except (TypeError, ValueError, AttributeError):
+        week_offset = 0
+    return max(0, min(week_offset, 520))
+
+def _max_week_offset(current_week_start, user_id=None):
+    earliest_workout_date = _earliest_active_workout_date(user_id)
+    if not earliest_workout_date:
+        return 0
+    earliest_week_start = earliest_workout_date - timedelta(days=earliest_workout_date.weekday())
+    return max(0, (current_week_start - earliest_week_start).days // 7)
 
 @app.route('/api/public-stats')
 def public_stats():
     today = date.today()
     current_week_start = today - timedelta(days=today.weekday())
+    week_offset = _requested_week_offset()
 
-    try:
-        week_offset = int((request.args.get('week_offset') or '0').strip())
-    except (TypeError, ValueError, AttributeError):
-        week_offset = 0
-    week_offset = max(0, min(week_offset, 520))
+    # Keyed by date as well so the cached week window rolls over at midnight.
+    # A hit (conditional or not) never touches the database.
+    cache_key = (today, week_offset)
+    cached = public_stats_cache.get(cache_key)
+    if cached is not None:
+        payload, etag = cached
+        return etagged_json(payload, etag)
 
     week_start = current_week_start - timedelta(days=7 * week_offset)
     week_end = week_start + timedelta(days=6)
 
-    weekly_workouts = Workout.query.filter(
-        Workout.archived == False,
-        Workout.date >= week_start,
-        Workout.date <= week_end,
-    ).count()
+    week_totals = _daily_totals(week_start, week_end)
+    weekly_workouts = sum(workouts for workouts, _, _ in week_totals.values())
     total_workouts = Workout.query.count()
-
-    calories_7d = (
-        db.session.query(func.sum(Workout.calories))
-        .filter(
-            Workout.archived == False,
-            Workout.date >= week_start,
-            Workout.date <= week_end,
-        )
-        .scalar()
-    ) or 0
+    calories_7d = sum(calories for _, calories, _ in week_totals.values())
 
     active_users = User.query.filter(User.role != 'admin', User.is_archived == False).count()
     target = max(1, active_users * 4)
     weekly_goal_pct = int(round((weekly_workouts / target) * 100))
 
     # Build a 7-day calories series for the homepage mini chart.
-    calories_rows = (
-        db.session.query(Workout.date, func.sum(Workout.calories))
-        .filter(
-            Workout.archived == False,
-            Workout.date >= week_start,
-            Workout.date <= week_end,
-        )
-        .group_by(Workout.date)
-        .all()
-    )
-    calories_map = {row[0]: int(row[1] or 0) for row in calories_rows}
+    calories_map = {day: calories for day, (_, calories, _) in week_totals.items()}
     weekly_labels = []
     weekly_calories = []
     weekday_labels = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
@@ -984,18 +2286,9 @@ def public_stats():
         weekly_labels.append(weekday_labels[day.weekday()])
         weekly_calories.append(calories_map.get(day, 0))
 
-    earliest_workout_date = (
-        db.session.query(func.min(Workout.date))
-        .filter(Workout.archived == False)
-        .scalar()
-    )
-    if earliest_workout_date:
-        earliest_week_start = earliest_workout_date - timedelta(days=earliest_workout_date.weekday())
-        max_week_offset = max(0, (current_week_start - earliest_week_start).days // 7)
-    else:
-        max_week_offset = 0
+    max_week_offset = _max_week_offset(current_week_start)
 
-    return jsonify({
+    payload = {
         'calories_7d': int(calories_7d),
         'total_workouts': total_workouts,
         'weekly_workouts': weekly_workouts,
@@ -1006,7 +2299,10 @@ def public_stats():
         'week_end': week_end.isoformat(),
         'week_offset': week_offset,
         'max_week_offset': max_week_offset,
-    })
+    }
+    etag = payload_etag('public-stats', payload)
+    public_stats_cache.set(cache_key, (payload, etag))
+    return etagged_json(payload, etag)
 
 @app.route('/user')
 def user_dashboard():
@@ -1015,7 +2311,7 @@ def user_dashboard():
         return redirect(url_for('login'))
 
     user = db.session.get(User, session['user_id'])
-    return render_template('user.html', user=user)
+    return render_template('user.html', user=user, avatar_url=avatar_url_for(user.avatar_hash))
 
 @app.route('/dashboard')
 def dashboard():
@@ -1042,29 +2338,65 @@ def admin_view_user(user_id):
         return redirect(url_for('admin_dashboard'))
     log_admin_action('view_user', target_user_id=user_id)
     db.session.commit()
-    return render_template('user.html', user=user, admin_view=True, view_user_id=user_id)
+    return render_template(
+        'user.html',
+        user=user,
+        avatar_url=avatar_url_for(user.avatar_hash),
+        admin_view=True,
+        view_user_id=user_id,
+    )
 
 @app.route('/admin/api/workouts/<int:user_id>', methods=['GET'])
 def admin_api_workouts(user_id):
     if session.get('role') != 'admin':
         return jsonify({'error': 'unauthorized'}), 401
-    workouts = Workout.query.filter_by(user_id=user_id).order_by(Workout.date.desc()).all()
-    active = []
-    archived = []
-    for w in workouts:
-        item = {
-            'id': w.id,
-            'activity': w.activity,
-            'duration': w.duration,
-            'calories': w.calories,
-            'date': w.date.isoformat(),
-            'tags': [t.name for t in w.tags],
-        }
-        if w.archived:
-            archived.append(item)
-        else:
-            active.append(item)
-    return jsonify({'active': active, 'archived': archived})
+    return _workout_listing_response(user_id)
+
+def _weekly_workouts_response(user_id):
+    # One user's Monday-Sunday window, read from daily_summary, so week
+    # navigation never needs the full workout history in the browser.
+    today = date.today()
+    current_week_start = today - timedelta(days=today.weekday())
+    week_offset = _requested_week_offset()
+
+    etag = make_etag('weekly', user_id, current_data_version(user_id), today.isoformat(), week_offset)
+    not_modified = not_modified_response(etag)
+    if not_modified is not None:
+        return not_modified
+
+    # Unlike the public chart, never page past this user's first workout.
+    max_week_offset = _max_week_offset(current_week_start, user_id)
+    week_offset = min(week_offset, max_week_offset)
+    week_start = current_week_start - timedelta(days=7 * week_offset)
+    week_end = week_start + timedelta(days=6)
+    week_totals = _daily_totals(week_start, week_end, user_id=user_id)
+
+    days = []
+    for i in range(7):
+        day = week_start + timedelta(days=i)
+        workouts, calories, minutes = week_totals.get(day, (0, 0, 0))
+        days.append({'date': day.isoformat(), 'workouts': workouts, 'calories': calories, 'minutes': minutes})
+
+    response = jsonify({
+        'week_start': week_start.isoformat(),
+        'week_end': week_end.isoformat(),
+        'week_offset': week_offset,
+        'max_week_offset': max_week_offset,
+        'days': days,
+        'totals': {
+            'workouts': sum(d['workouts'] for d in days),
+            'calories': sum(d['calories'] for d in days),
+            'minutes': sum(d['minutes'] for d in days),
+        },
+    })
+    response.set_etag(etag)
+    return response
+
+@app.route('/admin/api/workouts/<int:user_id>/weekly', methods=['GET'])
+def admin_api_workouts_weekly(user_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'unauthorized'}), 401
+    return _weekly_workouts_response(user_id)
 
 @app.route('/admin/users/<int:user_id>/archive', methods=['POST'])
 def admin_archive_user(user_id):
@@ -1074,8 +2406,11 @@ def admin_archive_user(user_id):
     if not user or user.role == 'admin':
         return jsonify({'error': 'not_found'}), 404
     user.is_archived = True
+    touch_data_version(user)
     log_admin_action('archive_user', target_user_id=user_id)
     db.session.commit()
+    invalidate_identity(user_id)
+    _mark_data_changed(user_id, 'user_archived')
     return jsonify({'ok': True})
 
 @app.route('/admin/users/<int:user_id>/restore', methods=['POST'])
@@ -1085,11 +2420,116 @@ def admin_restore_user(user_id):
     user = db.session.get(User, user_id)
     if not user or user.role == 'admin':
         return jsonify({'error': 'not_found'}), 404
+    if _pending_user_deletion(user_id):
+        return jsonify({'error': 'deletion_pending'}), 409
     user.is_archived = False
+    touch_data_version(user)
     log_admin_action('restore_user', target_user_id=user_id)
     db.session.commit()
+    invalidate_identity(user_id)
+    _mark_data_changed(user_id, 'user_restored')
     return jsonify({'ok': True})
 
+def user_deletion_job_payload(job):
+    return {
+        'id': job.id,
+        'user_id': job.user_id,
+        'username': job.username,
+        'status': job.status,
+        'workouts_total': job.workouts_total,
+        'workouts_deleted': job.workouts_deleted,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+def _pending_user_deletion(user_id):
+    # Failed jobs count as pending: the user is half-deleted until they finish.
+    return UserDeletionJob.query.filter(
+        UserDeletionJob.user_id == user_id,
+        UserDeletionJob.status != 'done',
+    ).first()
+
+def _claim_user_deletion_retry(job):
+    # Failed jobs, and queued/running ones whose worker stopped updating them
+    # (e.g. killed by a restart), may be resubmitted. Staleness is judged on
+    # the database clock that stamps updated_at, and the conditional UPDATE
+    # lets only one request (in any worker) pick the job up.
+    if job.status == 'done':
+        return False
+    if job.status != 'failed':
+        stale_after = timedelta(seconds=app.config['USER_DELETION_STALE_SECONDS'])
+        if job.updated_at > db.session.query(func.now()).scalar() - stale_after:
+            return False
+    claimed = db.session.execute(
+        update(UserDeletionJob)
+        .where(UserDeletionJob.id == job.id, UserDeletionJob.updated_at == job.updated_at)
+        .values(status='queued', updated_at=func.now()),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+def run_user_deletion_job(job_id):
+    # Workouts go in bounded chunks, each in its own short transaction, so
+    # a heavy user never holds long locks on workout/workout_tag. Chunks are
+    # idempotent: a failed or interrupted job simply resumes from what is left.
+    job = db.session.get(UserDeletionJob, job_id)
+    if job is None or job.status == 'done':
+        return
+    user_id = job.user_id
+    chunk_size = app.config['USER_DELETION_CHUNK_SIZE']
+    try:
+        job.status = 'running'
+        job.error = None
+        # Rollups first, so public stats stop counting the user right away.
+        DailySummary.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        TagDailySummary.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.commit()
+
+        while True:
+            workout_ids = [
+                workout_id for (workout_id,) in db.session.query(Workout.id)
+                .filter(Workout.user_id == user_id)
+                .order_by(Workout.id)
+                .limit(chunk_size)
+            ]
+            if not workout_ids:
+                break
+            db.session.execute(workout_tag.delete().where(workout_tag.c.workout_id.in_(workout_ids)))
+            db.session.execute(
+                delete(Workout).where(Workout.id.in_(workout_ids)),
+                execution_options={'synchronize_session': False},
+            )
+            job.workouts_deleted += len(workout_ids)
+            db.session.commit()
+
+        for model in (WeeklyGoal, UserSettings, ImportExportHistory, WorkoutTombstone):
+            model.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        user = db.session.get(User, user_id)
+        if user is not None:
+            avatar_hash = user.avatar_hash
+            db.session.delete(user)
+            db.session.flush()
+            release_avatar(avatar_hash)
+        completed_at = datetime.utcnow()
+        job.status = 'done'
+        job.completed_at = completed_at
+        if job.audit_log_id:
+            audit_entry = db.session.get(AdminAuditLog, job.audit_log_id)
+            if audit_entry is not None:
+                audit_entry.completed_at = completed_at
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(UserDeletionJob, job_id)
+        job.status = 'failed'
+        job.error = str(exc)[:255]
+        db.session.commit()
+        raise
+    invalidate_identity(user_id)
+    _mark_data_changed(user_id, 'user_deleted')
+
 @app.route('/admin/users/<int:user_id>/delete', methods=['POST'])
 def admin_delete_user(user_id):
     if session.get('role') != 'admin':
@@ -1097,50 +2537,137 @@ def admin_delete_user(user_id):
     user = db.session.get(User, user_id)
     if not user or user.role == 'admin':
         return jsonify({'error': 'not_found'}), 404
-    workouts = Workout.query.filter_by(user_id=user_id).all()
-    workout_ids = [w.id for w in workouts]
-    if workout_ids:
-        db.session.execute(workout_tag.delete().where(workout_tag.c.workout_id.in_(workout_ids)))
-    Workout.query.filter_by(user_id=user_id).delete()
-    DailySummary.query.filter_by(user_id=user_id).delete()
-    WeeklyGoal.query.filter_by(user_id=user_id).delete()
-    UserSettings.query.filter_by(user_id=user_id).delete()
-    ImportExportHistory.query.filter_by(user_id=user_id).delete()
-    log_admin_action('delete_user', target_user_id=user_id)
-    db.session.delete(user)
-    db.session.commit()
-    return jsonify({'ok': True})
+    job = _pending_user_deletion(user_id)
+    if job is None:
+        # Lock the account out now; the rows are removed by the background job.
+        user.is_archived = True
+        touch_data_version(user)
+        audit_entry = log_admin_action('delete_user', target_user_id=user_id)
+        db.session.flush()
+        job = UserDeletionJob(
+            user_id=user_id,
+            username=user.username,
+            audit_log_id=audit_entry.id if audit_entry else None,
+            workouts_total=Workout.query.filter_by(user_id=user_id).count(),
+        )
+        db.session.add(job)
+        db.session.commit()
+        invalidate_identity(user_id)
+        _mark_data_changed(user_id, 'user_deletion_queued')
+        background_jobs.submit(run_user_deletion_job, job.id)
+    elif _claim_user_deletion_retry(job):
+        background_jobs.submit(run_user_deletion_job, job.id)
+        db.session.refresh(job)
+    return jsonify({
+        'ok': True,
+        'job': user_deletion_job_payload(job),
+        'status_url': url_for('admin_user_deletion_status', job_id=job.id),
+    }), 202
+
+@app.route('/admin/jobs/user-deletions/<int:job_id>', methods=['GET'])
+def admin_user_deletion_status(job_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'unauthorized'}), 401
+    job = db.session.get(UserDeletionJob, job_id)
+    if job is None:
+        return jsonify({'error': 'not_found'}), 404
+    return jsonify(user_deletion_job_payload(job))
 
 # -------------------- WORKOUTS API --------------------
 @app.route('/api/workouts', methods=['GET'])
 def api_workouts():
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
-    user_id = session['user_id']
-    workouts = Workout.query.filter_by(user_id=user_id).order_by(Workout.date.desc()).all()
-    active = []
-    archived = []
-    for w in workouts:
-        item = {
-            'id': w.id,
-            'activity': w.activity,
-            'duration': w.duration,
-            'calories': w.calories,
-            'date': w.date.isoformat(),
-            'tags': [t.name for t in w.tags],
-        }
-        if w.archived:
-            archived.append(item)
-        else:
-            active.append(item)
-    return jsonify({'active': active, 'archived': archived})
+    return _workout_listing_response(session['user_id'])
+
+def _stream_workout_export(user_id):
+    requested = (request.args.get('format') or 'csv').lower()
+    if requested not in ('csv', 'json', 'ndjson'):
+        return jsonify({'error': 'invalid_format'}), 400
+    file_format = 'csv' if requested == 'csv' else 'json'
+    filename = 'workouts.csv' if file_format == 'csv' else 'workouts.ndjson'
+
+    def csv_line(values):
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator='\n').writerow(values)
+        return buf.getvalue()
+
+    def generate():
+        records = 0
+        completed = False
+        try:
+            if file_format == 'csv':
+                # UTF-8 BOM keeps Excel happy, matching the old client-side export.
+                yield '\ufeff' + csv_line(['Date', 'Activity', 'Duration', 'Calories', 'Tags'])
+            for chunk in _iter_workout_chunks(user_id):
+                if file_format == 'csv':
+                    lines = [
+                        csv_line([row.date.isoformat(), row.activity, row.duration, row.calories, ';'.join(tags)])
+                        for row, tags in chunk
+                    ]
+                else:
+                    lines = [
+                        json.dumps({
+                            'id': row.id,
+                            'date': row.date.isoformat(),
+                            'activity': row.activity,
+                            'duration': row.duration,
+                            'calories': row.calories,
+                            'tags': tags,
+                        }, ensure_ascii=False) + '\n'
+                        for row, tags in chunk
+                    ]
+                records += len(lines)
+                yield ''.join(lines)
+            completed = True
+        finally:
+            if session.get('role') == 'admin':
+                log_admin_action('export_workouts', target_user_id=user_id, meta={
+                    'format': file_format,
+                    'records': records,
+                })
+            else:
+                log_import_export(
+                    user_id=user_id,
+                    action='export',
+                    file_format=file_format,
+                    records=records,
+                    filename=filename,
+                    status='ok' if completed else 'failed',
+                    error_message=None if completed else 'export_interrupted',
+                )
+            db.session.commit()
+
+    mimetype = 'text/csv' if file_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/workouts/weekly', methods=['GET'])
+def api_workouts_weekly():
+    if session.get('role') != 'user':
+        return jsonify({'error': 'unauthorized'}), 401
+    return _weekly_workouts_response(session['user_id'])
+
+@app.route('/api/workouts/export', methods=['GET'])
+def export_workouts():
+    if session.get('role') != 'user':
+        return jsonify({'error': 'unauthorized'}), 401
+    return _stream_workout_export(session['user_id'])
+
+@app.route('/admin/api/workouts/<int:user_id>/export', methods=['GET'])
+def admin_export_workouts(user_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'unauthorized'}), 401
+    return _stream_workout_export(user_id)
 
 @app.route('/api/avatar', methods=['GET'])
 def get_avatar():
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
-    user = db.session.get(User, session['user_id'])
-    return jsonify({'avatar_url': user.avatar_url if user else None})
+    avatar_hash = db.session.query(User.avatar_hash).filter(User.id == session['user_id']).scalar()
+    return jsonify({'avatar_url': avatar_url_for(avatar_hash)})
 
 @app.route('/api/avatar', methods=['POST'])
 def set_avatar():
@@ -1155,12 +2682,39 @@ def set_avatar():
     # basic size guard (~2.5MB)
     if len(avatar_url) > 2_500_000:
         return jsonify({'error': 'too_large'}), 413
+    mimetype, image = _decode_avatar_data_url(avatar_url)
+    if not image:
+        return jsonify({'error': 'invalid_format'}), 400
     user = db.session.get(User, session['user_id'])
     if not user:
         return jsonify({'error': 'not_found'}), 404
-    user.avatar_url = avatar_url
+    previous_hash = user.avatar_hash
+    user.avatar_hash = store_avatar(mimetype, image)
+    if previous_hash != user.avatar_hash:
+        touch_data_version(user)
+        db.session.flush()
+        release_avatar(previous_hash)
     db.session.commit()
-    return jsonify({'ok': True})
+    _mark_data_changed(user.id, 'avatar_updated')
+    return jsonify({'ok': True, 'avatar_url': avatar_url_for(user.avatar_hash)})
+
+@app.route('/avatars/<avatar_hash>', methods=['GET'])
+def avatar_image(avatar_hash):
+    if session.get('role') not in ('user', 'admin'):
+        return jsonify({'error': 'unauthorized'}), 401
+    if not AVATAR_HASH_RE.match(avatar_hash):
+        return jsonify({'error': 'not_found'}), 404
+    cache_headers = {
+        'ETag': f'"{avatar_hash}"',
+        'Cache-Control': 'private, max-age=31536000, immutable',
+    }
+    # The URL is the content hash, so a matching validator never needs the blob.
+    if avatar_hash in request.if_none_match:
+        return Response(status=304, headers=cache_headers)
+    avatar = db.session.get(Avatar, avatar_hash)
+    if not avatar:
+        return jsonify({'error': 'not_found'}), 404
+    return Response(avatar.data, mimetype=avatar.mimetype, headers=cache_headers)
 
 @app.route('/api/settings', methods=['GET', 'POST'])
 def api_settings():
@@ -1245,6 +2799,77 @@ def api_weekly_goal():
         'goal_minutes': goal.goal_minutes,
     })
 
+def _tag_analytics_response(user_id=None):
+    # Totals per tag over [from, to] (default: this month so far), read from
+    # tag_daily_summary. user_id=None aggregates across all users.
+    today = date.today()
+    args = request.args
+    date_from = _parse_iso_date(args.get('from')) if args.get('from') else today.replace(day=1)
+    date_to = _parse_iso_date(args.get('to')) if args.get('to') else today
+    if not date_from or not date_to:
+        return jsonify({'error': 'invalid_date'}), 400
+    if date_to < date_from or (date_to - date_from).days >= MAX_TAG_ANALYTICS_DAYS:
+        return jsonify({'error': 'invalid_range', 'max_days': MAX_TAG_ANALYTICS_DAYS}), 400
+
+    if user_id is None:
+        version = users_data_validator()
+    else:
+        version = (current_data_version(user_id),)
+    etag = make_etag('tag-analytics', user_id or 'all', *version, date_from.isoformat(), date_to.isoformat())
+    not_modified = not_modified_response(etag)
+    if not_modified is not None:
+        return not_modified
+
+    minutes = func.sum(TagDailySummary.total_duration)
+    query = db.session.query(
+        ActivityTag.name,
+        func.sum(TagDailySummary.total_workouts),
+        minutes,
+        func.sum(TagDailySummary.total_calories),
+    ).join(
+        ActivityTag, ActivityTag.id == TagDailySummary.tag_id
+    ).filter(
+        TagDailySummary.summary_date >= date_from,
+        TagDailySummary.summary_date <= date_to,
+    )
+    if user_id is not None:
+        query = query.filter(TagDailySummary.user_id == user_id)
+    rows = query.group_by(ActivityTag.id, ActivityTag.name).order_by(minutes.desc(), ActivityTag.name).all()
+
+    payload = {
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'tags': [
+            {
+                'tag': name,
+                'workouts': int(workouts or 0),
+                'minutes': int(total_minutes or 0),
+                'calories': int(calories or 0),
+            }
+            for name, workouts, total_minutes, calories in rows
+        ],
+    }
+    return etagged_json(payload, etag)
+
+@app.route('/api/tags/analytics', methods=['GET'])
+def api_tag_analytics():
+    if session.get('role') != 'user':
+        return jsonify({'error': 'unauthorized'}), 401
+    return _tag_analytics_response(session['user_id'])
+
+@app.route('/admin/api/tags/analytics', methods=['GET'])
+def admin_tag_analytics():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'unauthorized'}), 401
+    user_id = request.args.get('user_id')
+    if user_id is None:
+        return _tag_analytics_response()
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        return jsonify({'error': 'invalid_user'}), 400
+    return _tag_analytics_response(user_id)
+
 @app.route('/api/import-export-log', methods=['POST'])
 def api_import_export_log():
     if session.get('role') != 'user':
@@ -1286,82 +2911,150 @@ def create_workout():
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
     data = request.get_json(silent=True) or request.form
-    current_user = db.session.get(User, session['user_id'])
-    activity = _clean_text(data.get('activity'), 100)
     tag_names = normalize_tags(data.get('tags') or data.get('tag'))
-    try:
-        duration = int(data.get('duration', 0))
-        calories = int(data.get('calories', 0))
-    except (TypeError, ValueError):
-        return jsonify({'error': 'invalid'}), 400
-    date_str = _clean_text(data.get('date'), 20)
-    if not _is_valid_activity(activity) or duration <= 0 or calories <= 0 or not date_str:
-        return jsonify({'error': 'invalid'}), 400
-    if duration > 1440 or calories > 20000:
-        return jsonify({'error': 'out_of_range'}), 400
-    try:
-        from datetime import date
-        y, m, d = map(int, date_str.split('-'))
-        workout_date = date(y, m, d)
-    except Exception:
-        return jsonify({'error': 'invalid_date'}), 400
-    if workout_date > date.today() or workout_date < date(2000, 1, 1):
-        return jsonify({'error': 'invalid_date_range'}), 400
+    fields, error = _parse_workout_fields(data)
+    if error:
+        return jsonify({'error': error}), 400
 
     w = Workout(
         user_id=session['user_id'],
-        username=current_user.username if current_user else None,
-        activity=activity,
-        duration=duration,
-        calories=calories,
-        date=workout_date,
+        username=_session_username(),
         archived=False,
+        change_version=bump_data_version(session['user_id']),
+        **fields,
     )
     db.session.add(w)
-    if tag_names:
-        w.tags = get_or_create_tags(tag_names)
     db.session.flush()
-    recalc_daily_summary(session['user_id'], workout_date)
+    if tag_names:
+        tag_ids = resolve_tag_ids(tag_names)
+        link_workout_tags((w.id, tag_ids[name]) for name in tag_names)
+        apply_tag_summary_deltas(w.user_id, [w], 1, {w.id: [tag_ids[name] for name in tag_names]})
+    apply_workout_summary_delta(w, 1)
     db.session.commit()
+    _mark_data_changed(w.user_id, 'workout_created')
     return jsonify({'id': w.id})
 
+@app.route('/workouts/import', methods=['POST'])
+def import_workouts():
+    if session.get('role') != 'user':
+        return jsonify({'error': 'unauthorized'}), 401
+    data = request.get_json(silent=True) or {}
+    rows = data.get('workouts')
+    file_format = (data.get('format') or 'json').lower()
+    filename = _clean_text(data.get('filename'), 200) or None
+    if filename:
+        filename = re.sub(r'[\r\n\t]', '_', filename)
+    if not isinstance(rows, list) or file_format not in ('csv', 'json'):
+        return jsonify({'error': 'invalid'}), 400
+    if len(rows) > MAX_IMPORT_ROWS:
+        return jsonify({'error': 'too_many_rows', 'max_rows': MAX_IMPORT_ROWS}), 413
+
+    user_id = session['user_id']
+    username = _session_username()
+
+    errors = []
+    imported = 0
+    summary_deltas = {}
+    change_version = None
+    for batch_start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        batch = []
+        for index, row in enumerate(rows[batch_start:batch_start + IMPORT_BATCH_SIZE], start=batch_start):
+            if not isinstance(row, dict):
+                errors.append({'row': index, 'error': 'invalid'})
+                continue
+            fields, error = _parse_workout_fields(row)
+            if error:
+                errors.append({'row': index, 'error': error})
+                continue
+            batch.append((fields, normalize_tags(row.get('tags') or row.get('tag'))))
+        if not batch:
+            continue
+        if change_version is None:
+            change_version = bump_data_version(user_id)
+        _insert_workout_batch(user_id, username, batch, change_version, imported)
+        imported += len(batch)
+        for fields, _ in batch:
+            workouts, calories, duration = summary_deltas.get(fields['date'], (0, 0, 0))
+            summary_deltas[fields['date']] = (
+                workouts + 1,
+                calories + fields['calories'],
+                duration + fields['duration'],
+            )
+
+    apply_daily_summary_deltas(user_id, summary_deltas, username=username)
+
+    log_import_export(
+        user_id=user_id,
+        action='import',
+        file_format=file_format,
+        records=imported,
+        filename=filename,
+        status='ok' if imported or not errors else 'failed',
+        error_message=f'{len(errors)} row(s) rejected' if errors else None,
+    )
+    db.session.commit()
+    if imported:
+        _mark_data_changed(user_id, 'workouts_imported')
+    return jsonify({'imported': imported, 'failed': len(errors), 'errors': errors})
+
 @app.route('/workouts/<int:workout_id>/archive', methods=['POST'])
 def archive_workout(workout_id):
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
-    w = Workout.query.filter_by(id=workout_id, user_id=session['user_id']).first()
+    w = Workout.query.filter_by(id=workout_id, user_id=session['user_id']).with_for_update().first()
     if not w:
         return jsonify({'error': 'not_found'}), 404
-    w.archived = True
-    recalc_daily_summary(w.user_id, w.date)
+    # Conditional UPDATE so a repeated or concurrent archive is counted once.
+    changed = Workout.query.filter_by(id=w.id, archived=False).update(
+        {'archived': True}, synchronize_session='fetch'
+    )
+    if changed:
+        w.change_version = bump_data_version(w.user_id)
+        apply_workout_summary_delta(w, -1)
+        apply_tag_summary_deltas(w.user_id, [w], -1)
     db.session.commit()
+    if changed:
+        _mark_data_changed(w.user_id, 'workout_archived')
     return jsonify({'ok': True})
 
 @app.route('/workouts/<int:workout_id>/restore', methods=['POST'])
 def restore_workout(workout_id):
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
-    w = Workout.query.filter_by(id=workout_id, user_id=session['user_id']).first()
+    w = Workout.query.filter_by(id=workout_id, user_id=session['user_id']).with_for_update().first()
     if not w:
         return jsonify({'error': 'not_found'}), 404
-    w.archived = False
-    recalc_daily_summary(w.user_id, w.date)
+    changed = Workout.query.filter_by(id=w.id, archived=True).update(
+        {'archived': False}, synchronize_session='fetch'
+    )
+    if changed:
+        w.change_version = bump_data_version(w.user_id)
+        apply_workout_summary_delta(w, 1)
+        apply_tag_summary_deltas(w.user_id, [w], 1)
     db.session.commit()
+    if changed:
+        _mark_data_changed(w.user_id, 'workout_restored')
     return jsonify({'ok': True})
 
 @app.route('/workouts/<int:workout_id>/delete', methods=['POST'])
 def delete_workout(workout_id):
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
-    w = Workout.query.filter_by(id=workout_id, user_id=session['user_id']).first()
+    w = Workout.query.filter_by(id=workout_id, user_id=session['user_id']).with_for_update().first()
     if not w:
         return jsonify({'error': 'not_found'}), 404
-    user_id = w.user_id
-    workout_date = w.date
+    # Read under the row lock so a concurrent archive/delete can't have
+    # already taken this workout out of the summaries.
+    was_active = not w.archived
+    if was_active:
+        apply_workout_summary_delta(w, -1)
+        apply_tag_summary_deltas(w.user_id, [w], -1)
     db.session.execute(workout_tag.delete().where(workout_tag.c.workout_id == w.id))
+    user_id = w.user_id
+    add_workout_tombstones(user_id, [w.id], bump_data_version(user_id))
     db.session.delete(w)
-    recalc_daily_summary(user_id, workout_date)
     db.session.commit()
+    _mark_data_changed(user_id, 'workout_deleted')
     return jsonify({'ok': True})
 
 @app.route('/workouts/restore-all', methods=['POST'])
@@ -1369,11 +3062,24 @@ def restore_all_workouts():
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
     user_id = session['user_id']
-    dates = [d for (d,) in db.session.query(Workout.date).filter_by(user_id=user_id, archived=True).distinct().all()]
-    Workout.query.filter_by(user_id=user_id, archived=True).update({'archived': False})
-    for d in dates:
-        recalc_daily_summary(user_id, d)
+    archived = and_(Workout.user_id == user_id, Workout.archived.is_(True))
+    restored = 0
+    if db.session.query(exists().where(archived)).scalar():
+        change_version = bump_data_version(user_id)
+        restored = db.session.execute(
+            update(Workout).where(archived).values(archived=False, change_version=change_version),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        # The restored rows are exactly the ones stamped with this version.
+        restored_dates = select(Workout.date).where(
+            Workout.user_id == user_id,
+            Workout.change_version == change_version,
+        ).distinct()
+        refresh_daily_summaries(user_id, restored_dates)
+        refresh_tag_summaries(user_id, restored_dates)
     db.session.commit()
+    if restored:
+        _mark_data_changed(user_id, 'archive_restored')
     return jsonify({'ok': True})
 
 @app.route('/workouts/clear-archive', methods=['POST'])
@@ -1381,37 +3087,179 @@ def clear_archived_workouts():
     if session.get('role') != 'user':
         return jsonify({'error': 'unauthorized'}), 401
     user_id = session['user_id']
-    archived = Workout.query.filter_by(user_id=user_id, archived=True).all()
-    workout_ids = [w.id for w in archived]
-    dates = {w.date for w in archived}
-    if workout_ids:
-        db.session.execute(workout_tag.delete().where(workout_tag.c.workout_id.in_(workout_ids)))
-    Workout.query.filter_by(user_id=user_id, archived=True).delete()
-    for d in dates:
-        recalc_daily_summary(user_id, d)
+    archived = and_(Workout.user_id == user_id, Workout.archived.is_(True))
+    cleared = 0
+    if db.session.query(exists().where(archived)).scalar():
+        # Archived rows never count towards daily_summary, so removing them
+        # leaves the rollups untouched; only links and tombstones follow.
+        archived_ids = select(Workout.id).where(archived)
+        change_version = bump_data_version(user_id)
+        db.session.execute(
+            insert(WorkoutTombstone).from_select(
+                ['user_id', 'workout_id', 'change_version'],
+                select(literal(user_id), Workout.id, literal(change_version)).where(archived),
+            )
+        )
+        db.session.execute(workout_tag.delete().where(workout_tag.c.workout_id.in_(archived_ids)))
+        cleared = db.session.execute(
+            delete(Workout).where(archived),
+            execution_options={'synchronize_session': False},
+        ).rowcount
     db.session.commit()
+    if cleared:
+        _mark_data_changed(user_id, 'archive_cleared')
     return jsonify({'ok': True})
 
+BATCH_WORKOUT_ACTIONS = {
+    # action: (rows it applies to, status reported, summary sign, event type)
+    'archive': (lambda row: not row.archived, 'archived', -1, 'workouts_archived'),
+    'restore': (lambda row: row.archived, 'restored', 1, 'workouts_restored'),
+    'delete': (lambda row: True, 'deleted', -1, 'workouts_deleted'),
+}
+
+def _batch_workout_action(action):
+    if session.get('role') != 'user':
+        return jsonify({'error': 'unauthorized'}), 401
+    data = request.get_json(silent=True) or {}
+    raw_ids = data.get('ids')
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({'error': 'invalid'}), 400
+    if len(raw_ids) > MAX_BATCH_WORKOUT_IDS:
+        return jsonify({'error': 'too_many_ids', 'max_ids': MAX_BATCH_WORKOUT_IDS}), 413
+    if any(isinstance(raw, bool) or not isinstance(raw, int) for raw in raw_ids):
+        return jsonify({'error': 'invalid'}), 400
+    ids = list(dict.fromkeys(raw_ids))
+
+    applies_to, done_status, sign, event_type = BATCH_WORKOUT_ACTIONS[action]
+    user_id = session['user_id']
+    # Locked so a concurrent single-row action cannot double-count a summary.
+    rows = db.session.query(
+        Workout.id,
+        Workout.date,
+        Workout.calories,
+        Workout.duration,
+        Workout.archived,
+    ).filter(
+        Workout.user_id == user_id,
+        Workout.id.in_(ids),
+    ).with_for_update().all()
+    rows_by_id = {row.id: row for row in rows}
+    targets = [row for row in rows if applies_to(row)]
+    target_ids = [row.id for row in targets]
+
+    if target_ids:
+        # Archived rows are already out of the summaries.
+        counted = [row for row in targets if not (action == 'delete' and row.archived)]
+        summary_deltas = {}
+        for row in counted:
+            workouts, calories, duration = summary_deltas.get(row.date, (0, 0, 0))
+            summary_deltas[row.date] = (
+                workouts + sign,
+                calories + sign * row.calories,
+                duration + sign * row.duration,
+            )
+        change_version = bump_data_version(user_id)
+        apply_tag_summary_deltas(user_id, counted, sign)
+        if action == 'delete':
+            db.session.execute(workout_tag.delete().where(workout_tag.c.workout_id.in_(target_ids)))
+            add_workout_tombstones(user_id, target_ids, change_version)
+            db.session.execute(delete(Workout).where(Workout.id.in_(target_ids)))
+        else:
+            db.session.execute(
+                update(Workout).where(Workout.id.in_(target_ids)).values(
+                    archived=(action == 'archive'),
+                    change_version=change_version,
+                )
+            )
+        apply_daily_summary_deltas(user_id, summary_deltas, username=_session_username())
+    db.session.commit()
+    if target_ids:
+        _mark_data_changed(user_id, event_type)
+
+    target_set = set(target_ids)
+    results = []
+    for workout_id in ids:
+        if workout_id in target_set:
+            status = done_status
+        elif workout_id in rows_by_id:
+            status = 'unchanged'
+        else:
+            status = 'not_found'
+        results.append({'id': workout_id, 'status': status})
+    return jsonify({'changed': len(target_ids), 'results': results})
+
+@app.route('/workouts/batch/archive', methods=['POST'])
+def batch_archive_workouts():
+    return _batch_workout_action('archive')
+
+@app.route('/workouts/batch/restore', methods=['POST'])
+def batch_restore_workouts():
+    return _batch_workout_action('restore')
+
+@app.route('/workouts/batch/delete', methods=['POST'])
+def batch_delete_workouts():
+    return _batch_workout_action('delete')
+
 # -------------------- REAL-TIME (SSE) --------------------
 @app.route('/events')
 def events():
-    if 'user_id' not in session:
+    role = session.get('role')
+    if 'user_id' not in session or role not in ('user', 'admin'):
         return jsonify({'error': 'unauthorized'}), 401
 
-    role = session.get('role')
-    # Admin page aggregates large datasets; slower heartbeat avoids UI lag.
-    interval = 4 if role == 'admin' else 2
+    # Users only hear about their own data; admins hear about everyone's.
+    channels = ('admin',) if role == 'admin' else (f"user:{session['user_id']}",)
+    keepalive = app.config['EVENT_STREAM_KEEPALIVE']
 
     def stream():
-        while True:
-            yield f"data: {int(time.time())}\n\n"
-            time.sleep(interval)
+        # Subscribed on first iteration, so a response closed before it
+        # starts (client gone during header flush) never leaves a queue behind.
+        subscriber = event_bus.subscribe(channels)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: change\ndata: {json.dumps(event)}\n\n"
+                if role == 'user' and event.get('type') in SESSION_REVOKING_EVENTS:
+                    break
+        finally:
+            event_bus.unsubscribe(subscriber)
 
     response = Response(stream(), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     return response
 
+# -------------------- MAINTENANCE --------------------
+@app.cli.command('reconcile-summaries')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user\'s summaries.')
+def reconcile_summaries_command(user_id):
+    """Rebuild daily_summary and tag_daily_summary rows from the workout table."""
+    try:
+        rebuilt = rebuild_daily_summaries(user_id)
+        rebuilt_tags = rebuild_tag_summaries(user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f'Rebuilt {rebuilt} daily summary row(s) and {rebuilt_tags} tag summary row(s).')
+
+@app.cli.command('resume-user-deletions')
+def resume_user_deletions_command():
+    """Finish user deletion jobs left queued, running or failed."""
+    job_ids = [
+        job_id for (job_id,) in db.session.query(UserDeletionJob.id)
+        .filter(UserDeletionJob.status != 'done')
+        .order_by(UserDeletionJob.id)
+    ]
+    for job_id in job_ids:
+        run_user_deletion_job(job_id)
+    click.echo(f'Completed {len(job_ids)} user deletion job(s).')
+
 # -------------------- RUN --------------------
 if __name__ == '__main__':
     debug_mode = os.environ.get('FLASK_DEBUG', '0') == '1'
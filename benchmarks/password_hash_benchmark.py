@@ -0,0 +1,57 @@
+"""Measure login verification throughput per core for password-hash policies.
+
+Each policy is timed with check_password_hash on one core, which is the CPU
+cost a single worker pays per login attempt:
+
+    python benchmarks/password_hash_benchmark.py
+    python benchmarks/password_hash_benchmark.py --policies pbkdf2:sha256:600000,pbkdf2:sha256:260000 --runs 50
+
+Pick PASSWORD_HASH_METHOD from the results; existing hashes are upgraded to
+the configured policy on each user's next successful login.
+"""
+import argparse
+import statistics
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_POLICIES = (
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:50000',
+    'scrypt:32768:8:1',
+)
+
+
+def time_policy(method, runs, password='StrongPass123'):
+    stored = generate_password_hash(password, method=method)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        if not check_password_hash(stored, password):
+            raise RuntimeError(f'{method}: verification failed')
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--policies', default=','.join(DEFAULT_POLICIES), help='Comma-separated Werkzeug hash methods.')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'policy':<24} {'median ms':>10} {'p95 ms':>8} {'logins/s/core':>14}")
+    for method in [m.strip() for m in args.policies.split(',') if m.strip()]:
+        try:
+            samples = sorted(time_policy(method, args.runs))
+        except (ValueError, AttributeError) as exc:
+            print(f'{method:<24} unsupported by this Werkzeug ({exc})')
+            continue
+        median = statistics.median(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f'{method:<24} {median * 1000:>10.1f} {p95 * 1000:>8.1f} {1 / median:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
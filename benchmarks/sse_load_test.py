@@ -0,0 +1,168 @@
+"""Open N simulated dashboard streams against sse_server.py.
+
+Start the server with a relay address, then point this script at it using
+the same environment (SECRET_KEY, database settings, EVENT_RELAY_ADDR):
+
+    $env:EVENT_RELAY_ADDR="127.0.0.1:8766"
+    python sse_server.py --port 8765
+    python benchmarks/sse_load_test.py --clients 5000 --user-id 2 --events 20 --server-pid <pid>
+
+Every client authenticates with a session cookie minted for --user-id/--role.
+The user must exist and must not be archived. Once all clients are
+connected, --events change events are sent through the relay, and the
+script reports connect failures, delivery counts and fan-out latency.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app as app_module  # noqa: E402
+
+
+def mint_session_cookie(user_id, role):
+    serializer = app_module.app.session_interface.get_signing_serializer(app_module.app)
+    value = serializer.dumps({'user_id': user_id, 'role': role})
+    return f"{app_module.app.config['SESSION_COOKIE_NAME']}={value}"
+
+
+class Client:
+    def __init__(self):
+        self.connected = False
+        self.error = None
+        self.latencies = []
+
+
+async def run_client(client, host, port, path, cookie, ready, stop):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as exc:
+        client.error = type(exc).__name__
+        ready.release()
+        return
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n'
+            f'Cookie: {cookie}\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        status = await reader.readline()
+        if b' 200 ' not in status:
+            client.error = status.decode(errors='replace').strip() or 'no_response'
+            return
+        await reader.readuntil(b'\r\n\r\n')
+        client.connected = True
+        ready.release()
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.startswith(b'data: '):
+                continue
+            event = json.loads(line[len(b'data: '):])
+            if 'sent_at' in event:
+                client.latencies.append(time.time() - event['sent_at'])
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as exc:
+        client.error = client.error or type(exc).__name__
+    finally:
+        if not client.connected:
+            ready.release()
+        writer.close()
+
+
+def read_rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+async def main_async(args):
+    url = urlsplit(args.url)
+    host, port, path = url.hostname, url.port or 80, url.path or '/events'
+    cookie = mint_session_cookie(args.user_id, args.role)
+    relay_address = app_module.parse_relay_address(args.relay)
+    channels = ('admin',) if args.role == 'admin' else (f'user:{args.user_id}',)
+
+    clients = [Client() for _ in range(args.clients)]
+    ready = asyncio.Semaphore(0)
+    stop = asyncio.Event()
+    rss_before = read_rss_kb(args.server_pid) if args.server_pid else None
+
+    started = time.perf_counter()
+    tasks = []
+    for index, client in enumerate(clients):
+        tasks.append(asyncio.create_task(run_client(client, host, port, path, cookie, ready, stop)))
+        if args.ramp and index % args.ramp == args.ramp - 1:
+            await asyncio.sleep(1)
+    for _ in clients:
+        await ready.acquire()
+    connect_seconds = time.perf_counter() - started
+    connected = sum(1 for c in clients if c.connected)
+    rss_connected = read_rss_kb(args.server_pid) if args.server_pid else None
+
+    if args.events and relay_address:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=relay_address)
+        for _ in range(args.events):
+            event = {'type': 'load_test', 'user_id': args.user_id, 'sent_at': time.time()}
+            transport.sendto(app_module.encode_relay_event(channels, event))
+            await asyncio.sleep(args.event_interval)
+        transport.close()
+    await asyncio.sleep(args.hold)
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = sorted(lat for c in clients for lat in c.latencies)
+    errors = {}
+    for c in clients:
+        if c.error:
+            errors[c.error] = errors.get(c.error, 0) + 1
+
+    print(f'clients   connected {connected}/{args.clients} in {connect_seconds:.1f}s')
+    if errors:
+        print('errors    ' + ', '.join(f'{name}: {count}' for name, count in sorted(errors.items())))
+    if args.events:
+        expected = connected * args.events
+        print(f'events    delivered {len(latencies)}/{expected}')
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f'latency   median {statistics.median(latencies) * 1000:.1f}ms  p95 {p95 * 1000:.1f}ms')
+    if rss_before and rss_connected:
+        per_stream = (rss_connected - rss_before) / max(connected, 1)
+        print(f'server    rss {rss_before / 1024:.1f}MB -> {rss_connected / 1024:.1f}MB ({per_stream:.1f}KB/stream)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test sse_server.py with simulated SSE clients.')
+    parser.add_argument('--url', default='http://127.0.0.1:8765/events')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--ramp', type=int, default=500, help='Connections opened per second (0 = all at once).')
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--role', choices=('user', 'admin'), default='user')
+    parser.add_argument('--relay', default=os.environ.get('EVENT_RELAY_ADDR'))
+    parser.add_argument('--events', type=int, default=10)
+    parser.add_argument('--event-interval', type=float, default=0.5)
+    parser.add_argument('--hold', type=float, default=2.0, help='Seconds to keep streams open after the last event.')
+    parser.add_argument('--server-pid', type=int, default=None, help='Report sse_server.py memory (Linux /proc only).')
+    args = parser.parse_args()
+    if args.events and not app_module.parse_relay_address(args.relay):
+        parser.error('--relay (or EVENT_RELAY_ADDR) is required to publish events')
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
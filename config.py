@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from datetime import timedelta
+from datetime import date, timedelta
 
 
 def _env_stripped(name):
@@ -11,6 +11,16 @@ def _env_stripped(name):
     return value or None
 
 
+def _env_date(name):
+    value = _env_stripped(name)
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise RuntimeError(f'{name} must be an ISO date (YYYY-MM-DD).') from exc
+
+
 def _is_development_mode():
     env = (os.environ.get('FLASK_ENV') or 'development').lower()
     debug = os.environ.get('FLASK_DEBUG', '0') == '1'
@@ -71,5 +81,76 @@ class Config:
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', '1' if not IS_DEV else '0') == '1'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=8)
 
+    # Password hashing policy, in Werkzeug's method syntax
+    # ('pbkdf2:sha256:<iterations>', or 'scrypt:<n>:<r>:<p>' on Werkzeug 2.3+).
+    # Stored hashes made under another policy are upgraded on the next login.
+    PASSWORD_HASH_METHOD = _env_stripped('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:260000'
+
+    # Hashing runs on a per-process pool of this many worker processes (0 =
+    # inline on the request thread). Beyond workers + queue size in-flight
+    # jobs, or after the timeout, auth requests get 503 with Retry-After.
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', '16'))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', '5'))
+    PASSWORD_HASH_RETRY_AFTER = 2
+
+    # Where failed-login counters live: 'memory' (per process, so each worker
+    # counts on its own) or a redis:// URL shared by all workers. The user row
+    # is only written when a lockout is imposed.
+    LOGIN_FAILURE_STORE = _env_stripped('LOGIN_FAILURE_STORE') or 'memory'
+    LOGIN_FAILURE_STORE_SIZE = 100000
+
+    # Token-bucket request budgets, '<METHOD> <route>' -> (requests, seconds).
+    # A '<METHOD> <prefix>/*' entry covers every route below the prefix with
+    # one shared bucket; exact entries take precedence.
+    # Buckets live in each worker process and are keyed by client address and
+    # by account (session user, or the email on a login form); a request needs
+    # a token from each. Over budget the client gets 429 with Retry-After.
+    # Behind a reverse proxy, wrap the app in ProxyFix so the address is the client's.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMITS = {
+        'POST /login': (10, 60),
+        'POST /admin-login': (5, 60),
+        'POST /register': (5, 300),
+        'POST /workouts': (60, 60),
+        'POST /workouts/import': (5, 60),
+        'POST /workouts/*': (60, 60),  # archive/restore/delete, batch and archive-wide actions
+        'GET /api/public-stats': (60, 60),
+    }
+    RATE_LIMIT_MAX_KEYS = 100000
+
+    # Dashboards read daily_summary rollups; days before this date (if set)
+    # are aggregated from the workout table instead.
+    DAILY_SUMMARY_COVERED_FROM = _env_date('DAILY_SUMMARY_COVERED_FROM')
+
+    # /api/public-stats response cache (per worker process). Workout writes
+    # invalidate it; the TTL bounds staleness across workers.
+    PUBLIC_STATS_CACHE_TTL = int(os.environ.get('PUBLIC_STATS_CACHE_TTL', '30'))
+    PUBLIC_STATS_CACHE_SIZE = 64
+
+    # Per-process cache of the slim identity row checked on every request.
+    # Admin archive/restore/delete evict entries; the TTL bounds how long
+    # another worker can keep honouring a revoked session.
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', '10'))
+    IDENTITY_CACHE_SIZE = 4096
+
+    # /events SSE streams: seconds between keepalive comments, and how many
+    # undelivered change events a stream may buffer before it is told to resync.
+    EVENT_STREAM_KEEPALIVE = int(os.environ.get('EVENT_STREAM_KEEPALIVE', '15'))
+    EVENT_QUEUE_SIZE = 64
+
+    # Per-process activity_tag name -> id cache used when tagging workouts.
+    # Tags are never renamed, so the TTL only bounds manual cleanups.
+    TAG_CACHE_TTL = int(os.environ.get('TAG_CACHE_TTL', '3600'))
+    TAG_CACHE_SIZE = 4096
 
+    # host:port of sse_server.py's UDP relay. When set, change events are
+    # also forwarded there so the async event server can fan them out.
+    EVENT_RELAY_ADDR = _env_stripped('EVENT_RELAY_ADDR')
 
+    # Admin user deletion runs as a background job that removes workouts in
+    # chunks of this many rows, one short transaction per chunk.
+    USER_DELETION_CHUNK_SIZE = int(os.environ.get('USER_DELETION_CHUNK_SIZE', '500'))
+    # A queued/running job not updated for this long is presumed orphaned (its
+    # worker died) and is resubmitted by the next delete request for the user.
+    USER_DELETION_STALE_SECONDS = int(os.environ.get('USER_DELETION_STALE_SECONDS', '600'))
@@ -0,0 +1,60 @@
+"""queue admin user deletions as background jobs
+
+Revision ID: b8e4f1c2d795
+Revises: f3a9c7d18b25
+Create Date: 2026-10-18 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4f1c2d795'
+down_revision = 'f3a9c7d18b25'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(bind, table_name, column_name):
+    inspector = inspect(bind)
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not _has_column(bind, 'admin_audit_log', 'completed_at'):
+        with op.batch_alter_table('admin_audit_log') as batch_op:
+            batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+
+    if not inspect(bind).has_table('user_deletion_job'):
+        op.create_table(
+            'user_deletion_job',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=150), nullable=True),
+            sa.Column('audit_log_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('workouts_total', sa.Integer(), nullable=False),
+            sa.Column('workouts_deleted', sa.Integer(), nullable=False),
+            sa.Column('error', sa.String(length=255), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['audit_log_id'], ['admin_audit_log.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_user_deletion_job_user_id', 'user_deletion_job', ['user_id'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table('user_deletion_job'):
+        op.drop_table('user_deletion_job')
+
+    if _has_column(bind, 'admin_audit_log', 'completed_at'):
+        with op.batch_alter_table('admin_audit_log') as batch_op:
+            batch_op.drop_column('completed_at')
@@ -0,0 +1,58 @@
+"""add tag_daily_summary rollup for tag analytics
+
+Revision ID: c5f7a3e9b1d4
+Revises: b8e4f1c2d795
+Create Date: 2026-10-18 17:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f7a3e9b1d4'
+down_revision = 'b8e4f1c2d795'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if inspect(bind).has_table('tag_daily_summary'):
+        return
+
+    op.create_table(
+        'tag_daily_summary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('summary_date', sa.Date(), nullable=False),
+        sa.Column('total_workouts', sa.Integer(), nullable=False),
+        sa.Column('total_calories', sa.Integer(), nullable=False),
+        sa.Column('total_duration', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.ForeignKeyConstraint(['tag_id'], ['activity_tag.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'summary_date', 'tag_id', name='uniq_user_day_tag'),
+    )
+    op.create_index('idx_tag_summary_date', 'tag_daily_summary', ['summary_date'], unique=False)
+
+    # Backfill from existing active workouts so analytics cover all history.
+    op.execute(
+        """
+        INSERT INTO tag_daily_summary
+            (user_id, tag_id, summary_date, total_workouts, total_calories, total_duration)
+        SELECT w.user_id, wt.tag_id, w.date, COUNT(w.id), SUM(w.calories), SUM(w.duration)
+        FROM workout w
+        JOIN workout_tag wt ON wt.workout_id = w.id
+        WHERE w.archived = 0
+        GROUP BY w.user_id, wt.tag_id, w.date
+        """
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if inspect(bind).has_table('tag_daily_summary'):
+        op.drop_table('tag_daily_summary')
@@ -0,0 +1,33 @@
+"""index daily_summary by date for dashboard rollups
+
+Revision ID: d41f7c2a9e10
+Revises: c9a2c9b4f3d1
+Create Date: 2026-10-18 09:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f7c2a9e10'
+down_revision = 'c9a2c9b4f3d1'
+branch_labels = None
+depends_on = None
+
+
+def _has_index(bind, table_name, index_name):
+    inspector = inspect(bind)
+    return any(idx['name'] == index_name for idx in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not _has_index(bind, 'daily_summary', 'idx_daily_summary_date'):
+        op.create_index('idx_daily_summary_date', 'daily_summary', ['summary_date'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if _has_index(bind, 'daily_summary', 'idx_daily_summary_date'):
+        op.drop_index('idx_daily_summary_date', table_name='daily_summary')
@@ -0,0 +1,125 @@
+"""move avatars out of the user row into a content-addressed table
+
+Revision ID: e7b3c1a9d2f4
+Revises: d41f7c2a9e10
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+import base64
+import binascii
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c1a9d2f4'
+down_revision = 'd41f7c2a9e10'
+branch_labels = None
+depends_on = None
+
+# Same list as app.AVATAR_MIMETYPES; other types (notably SVG, which can
+# carry script) are dropped rather than carried into the avatar table.
+AVATAR_MIMETYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/webp')
+
+
+def _has_column(bind, table_name, column_name):
+    inspector = inspect(bind)
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def _decode_data_url(data_url):
+    header, _, encoded = (data_url or '').partition(';base64,')
+    mimetype = header[len('data:'):] if header.startswith('data:') else None
+    if mimetype not in AVATAR_MIMETYPES or not encoded:
+        return None, None
+    try:
+        return mimetype, base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        return None, None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not inspect(bind).has_table('avatar'):
+        op.create_table(
+            'avatar',
+            sa.Column('hash', sa.String(length=64), nullable=False),
+            sa.Column('mimetype', sa.String(length=40), nullable=False),
+            sa.Column('data', sa.LargeBinary().with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=False),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+            sa.PrimaryKeyConstraint('hash'),
+        )
+
+    if not _has_column(bind, 'user', 'avatar_hash'):
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.add_column(sa.Column('avatar_hash', sa.String(length=64), nullable=True))
+
+    if _has_column(bind, 'user', 'avatar_url'):
+        # Fetch ids first so only one blob is held in memory at a time.
+        user_ids = bind.execute(
+            text("SELECT id FROM `user` WHERE avatar_url IS NOT NULL AND avatar_hash IS NULL")
+        ).scalars().all()
+        for user_id in user_ids:
+            data_url = bind.execute(
+                text("SELECT avatar_url FROM `user` WHERE id = :id"), {'id': user_id}
+            ).scalar()
+            mimetype, image = _decode_data_url(data_url)
+            if not image:
+                # Unsupported or malformed: the user falls back to no avatar.
+                continue
+            avatar_hash = hashlib.sha256(image).hexdigest()
+            bind.execute(
+                text("INSERT IGNORE INTO avatar (hash, mimetype, data) VALUES (:hash, :mimetype, :data)"),
+                {'hash': avatar_hash, 'mimetype': mimetype, 'data': image},
+            )
+            bind.execute(
+                text("UPDATE `user` SET avatar_hash = :hash WHERE id = :id"),
+                {'hash': avatar_hash, 'id': user_id},
+            )
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.drop_column('avatar_url')
+
+    # Rows copied by an earlier run of this migration before the type filter.
+    params = {f'm{i}': mimetype for i, mimetype in enumerate(AVATAR_MIMETYPES)}
+    allowed = ', '.join(f':{name}' for name in params)
+    bind.execute(
+        text(f"UPDATE `user` SET avatar_hash = NULL WHERE avatar_hash IN "
+             f"(SELECT hash FROM avatar WHERE mimetype NOT IN ({allowed}))"),
+        params,
+    )
+    bind.execute(text(f"DELETE FROM avatar WHERE mimetype NOT IN ({allowed})"), params)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if not _has_column(bind, 'user', 'avatar_url'):
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.add_column(sa.Column('avatar_url', sa.Text(), nullable=True))
+
+    if _has_column(bind, 'user', 'avatar_hash'):
+        if inspect(bind).has_table('avatar'):
+            rows = bind.execute(
+                text("SELECT id, avatar_hash FROM `user` WHERE avatar_hash IS NOT NULL")
+            ).all()
+            for user_id, avatar_hash in rows:
+                avatar = bind.execute(
+                    text("SELECT mimetype, data FROM avatar WHERE hash = :hash"), {'hash': avatar_hash}
+                ).first()
+                if not avatar:
+                    continue
+                data_url = f"data:{avatar.mimetype};base64,{base64.b64encode(avatar.data).decode('ascii')}"
+                bind.execute(
+                    text("UPDATE `user` SET avatar_url = :url WHERE id = :id"),
+                    {'url': data_url, 'id': user_id},
+                )
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.drop_column('avatar_hash')
+
+    if inspect(bind).has_table('avatar'):
+        op.drop_table('avatar')
@@ -0,0 +1,71 @@
+"""track per-user change versions and workout tombstones for delta sync
+
+Revision ID: f3a9c7d18b25
+Revises: e7b3c1a9d2f4
+Create Date: 2026-10-18 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c7d18b25'
+down_revision = 'e7b3c1a9d2f4'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(bind, table_name, column_name):
+    inspector = inspect(bind)
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def _has_index(bind, table_name, index_name):
+    inspector = inspect(bind)
+    return any(idx['name'] == index_name for idx in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not _has_column(bind, 'user', 'data_version'):
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.add_column(sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+    if not _has_column(bind, 'workout', 'change_version'):
+        with op.batch_alter_table('workout') as batch_op:
+            batch_op.add_column(sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False))
+    if not _has_index(bind, 'workout', 'idx_workout_user_version'):
+        op.create_index('idx_workout_user_version', 'workout', ['user_id', 'change_version'], unique=False)
+
+    if not inspect(bind).has_table('workout_tombstone'):
+        op.create_table(
+            'workout_tombstone',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('workout_id', sa.Integer(), nullable=False),
+            sa.Column('change_version', sa.BigInteger(), nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('idx_tombstone_user_version', 'workout_tombstone', ['user_id', 'change_version'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table('workout_tombstone'):
+        op.drop_table('workout_tombstone')
+
+    if _has_index(bind, 'workout', 'idx_workout_user_version'):
+        op.drop_index('idx_workout_user_version', table_name='workout')
+    if _has_column(bind, 'workout', 'change_version'):
+        with op.batch_alter_table('workout') as batch_op:
+            batch_op.drop_column('change_version')
+
+    if _has_column(bind, 'user', 'data_version'):
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.drop_column('data_version')
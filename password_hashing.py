@@ -0,0 +1,97 @@
+"""Password hashing on a bounded process pool.
+
+PBKDF2 holds the GIL for its whole run, so hashing on request threads stalls
+every other request a worker is serving. PasswordHashPool runs hash/verify
+calls in separate processes and refuses work beyond a fixed number of
+in-flight jobs instead of letting a login burst queue up behind it.
+
+Workers are spawned lazily on the first hash and then kept for the life of
+the process. Like any spawn child, each one re-imports the parent's
+``__main__`` (app.py itself under ``python app.py``) once at start-up, so
+keep module-level code there free of side effects.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHashPoolBusy(Exception):
+    """The pool is saturated (or timed out); the caller should answer 503."""
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(stored_hash, password):
+    return check_password_hash(stored_hash, password)
+
+
+class PasswordHashPool:
+    """Runs hashing in ``workers`` processes with at most ``queue_size`` jobs waiting.
+
+    With ``workers`` <= 0 every call runs inline on the calling thread.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max(0, queue_size)) if workers > 0 else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the parent is multi-threaded.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func, *args):
+        if self._slots is None:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashPoolBusy()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset_executor(executor)
+            raise PasswordHashPoolBusy() from None
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the job really finishes, even if we stop waiting.
+        future.add_done_callback(lambda _future: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PasswordHashPoolBusy() from None
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise PasswordHashPoolBusy() from None
+
+    def hash(self, password, method):
+        return self._run(_hash, password, method)
+
+    def verify(self, stored_hash, password):
+        return self._run(_verify, stored_hash, password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
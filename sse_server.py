@@ -0,0 +1,260 @@
+"""Asyncio server for /events that holds thousands of idle SSE streams.
+
+The Flask /events route keeps one WSGI thread busy per open tab. This server
+answers the same endpoint from a single event loop instead. Run it next to
+the app and route /events to it at the reverse proxy:
+
+    $env:EVENT_RELAY_ADDR="127.0.0.1:8766"   # same value for both processes
+    python sse_server.py --port 8765
+
+Flask workers forward their change events to the UDP relay address (signed
+with SECRET_KEY). Browsers are authenticated with the Flask session cookie and
+the same identity rules as enforce_session_identity.
+"""
+import argparse
+import asyncio
+import json
+from http.cookies import CookieError, SimpleCookie
+
+from itsdangerous import BadSignature
+
+from app import (
+    SESSION_REVOKING_EVENTS,
+    app,
+    db,
+    decode_relay_event,
+    load_session_identity,
+    parse_relay_address,
+    session_identity_allows,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HEADER_LIMIT = 16 * 1024
+HEADER_TIMEOUT = 10
+
+
+class StreamHub:
+    """Channel fan-out for the streams held by this process."""
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.clients = 0
+        self._channels = {}
+
+    def subscribe(self, channels):
+        subscriber = asyncio.Queue(maxsize=self.queue_size)
+        for channel in channels:
+            self._channels.setdefault(channel, set()).add(subscriber)
+        self.clients += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber, channels):
+        for channel in channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._channels[channel]
+        self.clients -= 1
+
+    def publish(self, channels, event):
+        targets = set()
+        for channel in channels:
+            targets.update(self._channels.get(channel, ()))
+        for subscriber in targets:
+            try:
+                subscriber.put_nowait(event)
+            except asyncio.QueueFull:
+                # Same contract as EventBus: a stalled stream gets one resync.
+                while not subscriber.empty():
+                    subscriber.get_nowait()
+                subscriber.put_nowait({'type': 'resync'})
+
+
+class RelayProtocol(asyncio.DatagramProtocol):
+    def __init__(self, hub):
+        self.hub = hub
+
+    def datagram_received(self, data, addr):
+        message = decode_relay_event(data)
+        if message is None:
+            return
+        channels, event = message
+        self.hub.publish(channels, event)
+
+
+def _session_from_headers(headers):
+    try:
+        cookies = SimpleCookie(headers.get('cookie', ''))
+    except CookieError:
+        return None
+    morsel = cookies.get(app.config['SESSION_COOKIE_NAME'])
+    if morsel is None:
+        return None
+    serializer = app.session_interface.get_signing_serializer(app)
+    try:
+        return serializer.loads(
+            morsel.value,
+            max_age=int(app.permanent_session_lifetime.total_seconds()),
+        )
+    except BadSignature:
+        return None
+
+
+def _identity_allows(user_id, role):
+    with app.app_context():
+        try:
+            return session_identity_allows(load_session_identity(user_id), role)
+        finally:
+            db.session.remove()
+
+
+async def _read_request(reader):
+    raw = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), HEADER_TIMEOUT)
+    lines = raw.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) != 3:
+        return None, None, {}
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1].partition('?')[0], headers
+
+
+async def _respond(writer, status, body):
+    payload = json.dumps(body).encode()
+    writer.write(
+        f'HTTP/1.1 {status}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(payload)}\r\n'
+        'Connection: close\r\n\r\n'.encode() + payload
+    )
+    await writer.drain()
+
+
+class EventServer:
+    def __init__(self, hub, max_clients, keepalive):
+        self.hub = hub
+        self.max_clients = max_clients
+        self.keepalive = keepalive
+
+    async def handle(self, reader, writer):
+        try:
+            await self._serve(reader, writer)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, reader, writer):
+        method, path, headers = await _read_request(reader)
+        if method != 'GET' or path != '/events':
+            await _respond(writer, '404 Not Found', {'error': 'not_found'})
+            return
+        if self.hub.clients >= self.max_clients:
+            await _respond(writer, '503 Service Unavailable', {'error': 'too_many_streams'})
+            return
+
+        session_data = _session_from_headers(headers) or {}
+        user_id = session_data.get('user_id')
+        role = session_data.get('role')
+        if not user_id or role not in ('user', 'admin'):
+            await _respond(writer, '401 Unauthorized', {'error': 'unauthorized'})
+            return
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, _identity_allows, user_id, role):
+            await _respond(writer, '401 Unauthorized', {'error': 'session_invalid'})
+            return
+
+        channels = ('admin',) if role == 'admin' else (f'user:{user_id}',)
+        subscriber = self.hub.subscribe(channels)
+        # EventSource never sends a body, so any read completing means the
+        # client went away; release the stream now rather than at the next write.
+        disconnected = asyncio.ensure_future(reader.read(1))
+        try:
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/event-stream\r\n'
+                b'Cache-Control: no-store\r\n'
+                b'X-Accel-Buffering: no\r\n'
+                b'Connection: close\r\n\r\n'
+                b'retry: 5000\n\n'
+            )
+            await writer.drain()
+            while True:
+                getter = asyncio.ensure_future(subscriber.get())
+                done, _ = await asyncio.wait(
+                    {getter, disconnected},
+                    timeout=self.keepalive,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected in done:
+                    getter.cancel()
+                    return
+                if getter in done:
+                    event = getter.result()
+                    writer.write(f'event: change\ndata: {json.dumps(event)}\n\n'.encode())
+                else:
+                    getter.cancel()
+                    event = None
+                    writer.write(b': keepalive\n\n')
+                # A client that stops reading is dropped instead of buffered.
+                await asyncio.wait_for(writer.drain(), self.keepalive)
+                if event and role == 'user' and event.get('type') in SESSION_REVOKING_EVENTS:
+                    return
+        finally:
+            disconnected.cancel()
+            self.hub.unsubscribe(subscriber, channels)
+
+
+def _raise_open_file_limit(wanted):
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+async def serve(host, port, relay_address, max_clients):
+    hub = StreamHub(queue_size=app.config['EVENT_QUEUE_SIZE'])
+    server = EventServer(hub, max_clients, app.config['EVENT_STREAM_KEEPALIVE'])
+    loop = asyncio.get_running_loop()
+    if relay_address:
+        await loop.create_datagram_endpoint(lambda: RelayProtocol(hub), local_addr=relay_address)
+    listener = await asyncio.start_server(server.handle, host, port, limit=HEADER_LIMIT, backlog=1024)
+    relay_label = '%s:%s' % relay_address if relay_address else 'disabled'
+    print(f'Serving /events on {host}:{port} (relay {relay_label}, max {max_clients} streams)')
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--relay', default=app.config.get('EVENT_RELAY_ADDR'),
+                        help='UDP host:port Flask workers send change events to (default: EVENT_RELAY_ADDR).')
+    parser.add_argument('--max-clients', type=int, default=10000)
+    args = parser.parse_args()
+
+    relay_address = parse_relay_address(args.relay)
+    if args.relay and not relay_address:
+        parser.error('--relay must be host:port')
+    _raise_open_file_limit(args.max_clients + 64)
+    try:
+        asyncio.run(serve(args.host, args.port, relay_address, args.max_clients))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -15,18 +15,25 @@
     const searchInput = document.getElementById('adminSearch');
     const statusFilter = document.getElementById('adminStatusFilter');
     const sortSelect = document.getElementById('adminSort');
+    const prevPageBtn = document.getElementById('adminPrevPage');
+    const nextPageBtn = document.getElementById('adminNextPage');
+    const pageLabel = document.getElementById('adminPageLabel');
     const toastContainer = document.getElementById('adminToastContainer');
     const defaultAvatar = document.body?.dataset?.defaultAvatar || '/static/images/FitTrack.jpg';
 
     const state = {
       activeUsers: [],
       archivedUsers: [],
+      pagination: { page: 1, pages: 1, active_total: 0, archived_total: 0 },
       filters: {
         query: '',
         status: 'all',
         sort: 'username_asc'
       }
     };
+    const PAGE_SIZE = 25;
+    const SEARCH_DEBOUNCE_MS = 300;
+    const CHANGE_DEBOUNCE_MS = 500;
     const AUTO_REFRESH_MIN_MS = 15000;
     const FALLBACK_POLL_MS = 30000;
     let lastAutoRefreshAt = 0;
@@ -34,7 +41,6 @@
     const escapeHtml = (value) => String(value || '').replace(/[&<>"']/g, (s) => (
       { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#039;' }[s]
     ));
-    const toNumber = (value) => Number(value || 0);
 
     const announce = (message) => {
       if (!liveRegion) return;
@@ -89,46 +95,16 @@
       return handleResponse(res);
     };
 
-    const getFilteredAndSorted = () => {
-      const query = state.filters.query.trim().toLowerCase();
-      const status = state.filters.status;
-      const sort = state.filters.sort;
-
-      const matchUser = (u) => {
-        if (!query) return true;
-        const haystack = [
-          u.username || '',
-          u.email || '',
-          u.freq_activity || ''
-        ].join(' ').toLowerCase();
-        return haystack.includes(query);
-      };
-
-      let active = state.activeUsers.filter(matchUser);
-      let archived = state.archivedUsers.filter(matchUser);
-
-      if (status === 'active') archived = [];
-      if (status === 'archived') active = [];
-
-      const compareBySort = (a, b) => {
-        switch (sort) {
-          case 'username_desc':
-            return String(b.username || '').localeCompare(String(a.username || ''), undefined, { sensitivity: 'base' });
-          case 'active_desc':
-            return toNumber(b.active_count) - toNumber(a.active_count) || String(a.username || '').localeCompare(String(b.username || ''), undefined, { sensitivity: 'base' });
-          case 'avg_cal_desc':
-            return toNumber(b.avg_cal) - toNumber(a.avg_cal) || String(a.username || '').localeCompare(String(b.username || ''), undefined, { sensitivity: 'base' });
-          case 'archived_desc':
-            return toNumber(b.archived_count) - toNumber(a.archived_count) || String(a.username || '').localeCompare(String(b.username || ''), undefined, { sensitivity: 'base' });
-          case 'username_asc':
-          default:
-            return String(a.username || '').localeCompare(String(b.username || ''), undefined, { sensitivity: 'base' });
-        }
-      };
-
-      active.sort(compareBySort);
-      archived.sort(compareBySort);
-      return { active, archived };
+    const buildDataUrl = () => {
+      const params = new URLSearchParams({
+        page: String(state.pagination.page),
+        limit: String(PAGE_SIZE),
+        sort: state.filters.sort,
+        status: state.filters.status
+      });
+      const query = state.filters.query.trim();
+      if (query) params.set('q', query);
+      return `/admin/data?${params.toString()}`;
     };
 
     const renderRows = (rows) => rows.map((u) => `
@@ -176,12 +152,16 @@
         </td>
       </tr>`).join('') || '<tr><td colspan="4" class="text-center text-muted">No archived users match current filters</td></tr>';
 
-    const updateMeta = (activeCount, archivedCount) => {
+    const updateMeta = () => {
+      const { page, pages, active_total: activeCount, archived_total: archivedCount } = state.pagination;
       if (activeCountBadge) activeCountBadge.textContent = String(activeCount);
       if (archivedCountBadge) archivedCountBadge.textContent = String(archivedCount);
       if (resultSummary) {
-        resultSummary.textContent = `Showing ${activeCount + archivedCount} users (${activeCount} active, ${archivedCount} archived)`;
+        resultSummary.textContent = `Matching ${activeCount + archivedCount} users (${activeCount} active, ${archivedCount} archived)`;
       }
+      if (pageLabel) pageLabel.textContent = `Page ${page} of ${pages}`;
+      if (prevPageBtn) prevPageBtn.disabled = page <= 1;
+      if (nextPageBtn) nextPageBtn.disabled = page >= pages;
     };
 
     const wireActions = () => {
@@ -211,7 +191,7 @@
           if (!id || !confirm('Delete this user and all workouts?')) return;
           try {
             await postAdmin(`/admin/users/${id}/delete`);
-            showToast('User deleted permanently.', 'warning');
+            showToast('User deletion started.', 'warning');
             loadAdminData();
           } catch {
             showToast('Could not delete user.', 'danger');
@@ -233,13 +213,12 @@
       });
     };
 
-    const applyFiltersAndRender = () => {
-      const { active, archived } = getFilteredAndSorted();
-      if (usersTableBody) usersTableBody.innerHTML = renderRows(active);
-      if (archivedUsersTableBody) archivedUsersTableBody.innerHTML = renderArchived(archived);
+    const renderUsers = () => {
+      if (usersTableBody) usersTableBody.innerHTML = renderRows(state.activeUsers);
+      if (archivedUsersTableBody) archivedUsersTableBody.innerHTML = renderArchived(state.archivedUsers);
       if (activeSection) activeSection.classList.toggle('d-none', state.filters.status === 'archived');
       if (archivedSection) archivedSection.classList.toggle('d-none', state.filters.status === 'active');
-      updateMeta(active.length, archived.length);
+      updateMeta();
       wireActions();
     };
 
@@ -249,7 +228,7 @@
       loadingAdminData = true;
       if (refreshBtn) refreshBtn.disabled = true;
       try {
-        const res = await fetch('/admin/data', { cache: 'no-store' });
+        const res = await fetch(buildDataUrl(), { cache: 'no-cache' });
         const data = await handleResponse(res);
 
         const snap = data.today_snapshot || {};
@@ -270,7 +249,13 @@
 
         state.activeUsers = data.user_stats || [];
         state.archivedUsers = data.archived_users || [];
-        applyFiltersAndRender();
+        state.pagination = { ...state.pagination, ...(data.pagination || {}) };
+        if (state.pagination.page > state.pagination.pages) {
+          state.pagination.page = state.pagination.pages;
+          loadingAdminData = false;
+          return loadAdminData();
+        }
+        renderUsers();
 
         const now = new Date();
         if (lastSync) {
@@ -301,11 +286,19 @@
       }, FALLBACK_POLL_MS);
     };
 
+    let changeTimer = null;
+    const scheduleChangeRefresh = () => {
+      clearTimeout(changeTimer);
+      changeTimer = setTimeout(() => {
+        loadAdminData().catch(() => {});
+      }, CHANGE_DEBOUNCE_MS);
+    };
+
     if (window.EventSource) {
       const es = new EventSource('/events');
-      es.onmessage = () => {
-        maybeAutoRefresh();
-      };
+      es.addEventListener('change', () => {
+        scheduleChangeRefresh();
+      });
       es.onerror = () => {
         startFallbackPolling();
       };
@@ -325,28 +318,51 @@
         if (searchInput) searchInput.value = '';
         if (statusFilter) statusFilter.value = 'all';
         if (sortSelect) sortSelect.value = 'username_asc';
-        applyFiltersAndRender();
+        reloadFromFirstPage();
       });
     }
 
+    const reloadFromFirstPage = () => {
+      state.pagination.page = 1;
+      loadAdminData().catch(() => {});
+    };
+
+    let searchTimer = null;
     if (searchInput) {
       searchInput.addEventListener('input', () => {
         state.filters.query = searchInput.value || '';
-        applyFiltersAndRender();
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(reloadFromFirstPage, SEARCH_DEBOUNCE_MS);
       });
     }
 
     if (statusFilter) {
       statusFilter.addEventListener('change', () => {
         state.filters.status = statusFilter.value;
-        applyFiltersAndRender();
+        reloadFromFirstPage();
       });
     }
 
     if (sortSelect) {
       sortSelect.addEventListener('change', () => {
         state.filters.sort = sortSelect.value;
-        applyFiltersAndRender();
+        reloadFromFirstPage();
+      });
+    }
+
+    if (prevPageBtn) {
+      prevPageBtn.addEventListener('click', () => {
+        if (state.pagination.page <= 1) return;
+        state.pagination.page -= 1;
+        loadAdminData().catch(() => {});
+      });
+    }
+
+    if (nextPageBtn) {
+      nextPageBtn.addEventListener('click', () => {
+        if (state.pagination.page >= state.pagination.pages) return;
+        state.pagination.page += 1;
+        loadAdminData().catch(() => {});
       });
     }
 
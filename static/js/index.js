@@ -173,7 +173,7 @@
       if (!calEl || !totalEl || !goalEl || bars.length !== 7) return;
 
       try {
-        const res = await fetch(`/api/public-stats?week_offset=${snapshotWeekOffset}`, { cache: 'no-store' });
+        const res = await fetch(`/api/public-stats?week_offset=${snapshotWeekOffset}`, { cache: 'no-cache' });
         if (!res.ok) return;
         const data = await res.json();
 
@@ -66,6 +66,7 @@ const dom = {
 // ------------------- STATE -------------------
 let activeWorkouts = [];
 let archivedWorkouts = [];
+let syncToken = null;
 const adminView = document.body?.dataset?.adminView === '1';
 const viewUserId = document.body?.dataset?.viewUserId;
 const csrfToken = document.querySelector('meta[name="csrf-token"]')?.content || '';
@@ -73,6 +74,7 @@ let eventSource = null;
 let loadingWorkouts = false;
 let avatarHydrated = false;
 let lastAutoRefreshAt = 0;
+const CHANGE_DEBOUNCE_MS = 500;
 const AUTO_REFRESH_MIN_MS = 15000;
 const FALLBACK_POLL_MS = 30000;
 const uiState = {
@@ -81,6 +83,10 @@ const uiState = {
     minCalories: 0
 };
 let chartWeekOffset = 0;
+// Server-side week window (/api/workouts/weekly) and how far back it can go.
+let weekData = null;
+let maxWeekOffset = 0;
+let weekRequestSeq = 0;
 
 // ------------------- HELPERS -------------------
 const safeNum = v => Math.max(0, Number(v) || 0);
@@ -121,21 +127,6 @@ function getWeekWindow(weekOffset = 0) {
     return { startDate, endDate };
 }
 
-function getMaxWeekOffset(arr) {
-    let earliest = null;
-    for (const workout of arr || []) {
-        const parsed = parseIsoDateSafe(workout.date);
-        if (!parsed) continue;
-        if (!earliest || parsed < earliest) earliest = parsed;
-    }
-    if (!earliest) return 0;
-
-    const currentWeekStart = getWeekStartMonday(new Date());
-    const earliestWeekStart = getWeekStartMonday(earliest);
-    const diffDays = Math.max(0, Math.floor((currentWeekStart - earliestWeekStart) / DAY_MS));
-    return Math.floor(diffDays / 7);
-}
-
 function formatWeekRange(startDate, endDate) {
     const sameYear = startDate.getFullYear() === endDate.getFullYear();
     const startText = startDate.toLocaleDateString(UI_LOCALE, { month: 'short', day: 'numeric' });
@@ -371,15 +362,35 @@ async function logImportExport(action, format, records, filename) {
 }
 
 // ------------------- DATA LOAD -------------------
+const byNewestFirst = (a, b) => String(b.date || '').localeCompare(String(a.date || '')) || b.id - a.id;
+
+function applyWorkoutChanges(delta) {
+    const changed = delta.changed || [];
+    const removed = new Set((delta.deleted || []).concat(changed.map(w => w.id)));
+    activeWorkouts = activeWorkouts.filter(w => !removed.has(w.id));
+    archivedWorkouts = archivedWorkouts.filter(w => !removed.has(w.id));
+    changed.forEach(({ archived, ...workout }) => {
+        (archived ? archivedWorkouts : activeWorkouts).push(workout);
+    });
+    activeWorkouts.sort(byNewestFirst);
+    archivedWorkouts.sort(byNewestFirst);
+}
+
 async function loadWorkouts() {
     if (loadingWorkouts) return;
     loadingWorkouts = true;
     try {
-        const data = adminView && viewUserId
-            ? await apiGet(`/admin/api/workouts/${viewUserId}`)
-            : await apiGet('/api/workouts');
-        activeWorkouts = data.active || [];
-        archivedWorkouts = data.archived || [];
+        const baseUrl = adminView && viewUserId ? `/admin/api/workouts/${viewUserId}` : '/api/workouts';
+        // After the first full load only rows changed since the last sync are fetched.
+        const data = await apiGet(syncToken ? `${baseUrl}?since=${encodeURIComponent(syncToken)}` : baseUrl);
+        if (Array.isArray(data.changed)) {
+            applyWorkoutChanges(data);
+        } else {
+            activeWorkouts = data.active || [];
+            archivedWorkouts = data.archived || [];
+        }
+        syncToken = data.sync_token || null;
+        await fetchWeekData();
         if (!adminView && !avatarHydrated) {
             const avatar = await apiGet('/api/avatar');
             if (avatar && avatar.avatar_url) {
@@ -488,7 +499,7 @@ function setImportFeedback(msg, isError = false) {
 }
 
 function parseCsv(text) {
-    const lines = text.split(/\r?\n/).filter(Boolean);
+    const lines = text.replace(/^\uFEFF/, '').split(/\r?\n/).filter(Boolean);
     if (!lines.length) return [];
     const header = lines[0].split(',').map(h => h.trim().toLowerCase());
     const idx = {
@@ -498,13 +509,15 @@ function parseCsv(text) {
         calories: header.indexOf('calories')
     };
     if (Object.values(idx).some(i => i === -1)) return [];
+    const tagsIdx = header.indexOf('tags');
     return lines.slice(1).map(line => {
         const cols = line.split(',').map(c => c.trim());
         return {
             date: cols[idx.date],
             activity: cols[idx.activity],
             duration: safeNum(cols[idx.duration]),
-            calories: safeNum(cols[idx.calories])
+            calories: safeNum(cols[idx.calories]),
+            tags: tagsIdx === -1 ? '' : cols[tagsIdx]
         };
     }).filter(w => w.date && w.activity && w.duration > 0 && w.calories > 0);
 }
@@ -514,18 +527,23 @@ async function importWorkouts(arr, sourceFormat, filename) {
         setImportFeedback('No valid workouts found.', true);
         return;
     }
-    for (const w of arr) {
-        await apiPost('/workouts', {
+    const result = await apiPost('/workouts/import', {
+        format: sourceFormat || 'json',
+        filename: filename || null,
+        workouts: arr.map(w => ({
             activity: w.activity,
             duration: w.duration,
             calories: w.calories,
-            date: w.date
-        });
-    }
+            date: w.date,
+            tags: w.tags || ''
+        }))
+    });
     await loadWorkouts();
-    setImportFeedback('Import completed successfully.');
-    if (sourceFormat) {
-        await logImportExport('import', sourceFormat, arr.length, filename);
+    const failed = safeNum(result.failed);
+    if (failed > 0) {
+        setImportFeedback(`Imported ${safeNum(result.imported)} workouts, ${failed} rows rejected.`, !result.imported);
+    } else {
+        setImportFeedback('Import completed successfully.');
     }
 }
 
@@ -569,43 +587,55 @@ function renderArchive() {
 }
 
 // ------------------- CHART DATA AGGREGATION -------------------
-function aggregateWeekWindow(arr, weekOffset = 0) {
-    const { startDate, endDate } = getWeekWindow(weekOffset);
+async function fetchWeekData() {
+    // Per-day totals come from the server's daily rollups; only the newest
+    // response is kept when the user clicks through weeks quickly.
+    const seq = ++weekRequestSeq;
+    const baseUrl = adminView && viewUserId ? `/admin/api/workouts/${viewUserId}/weekly` : '/api/workouts/weekly';
+    const data = await apiGet(`${baseUrl}?week_offset=${chartWeekOffset}`);
+    if (seq !== weekRequestSeq) return false;
+    weekData = data;
+    maxWeekOffset = Math.max(0, Number(data.max_week_offset) || 0);
+    chartWeekOffset = Math.max(0, Number(data.week_offset) || 0);
+    return true;
+}
+
+async function loadWeek() {
+    try {
+        if (!await fetchWeekData()) return;
+    } catch {
+        showToast('Could not load that week right now.', 'danger');
+        return;
+    }
+    updateStats(renderCharts());
+    announce(`Showing weekly progress for ${dom.weekRange?.textContent || 'selected week'}.`);
+}
+
+function currentWeekAggregate() {
+    const fallback = getWeekWindow(chartWeekOffset);
+    const startDate = parseIsoDateSafe(weekData?.week_start) || fallback.startDate;
+    const endDate = parseIsoDateSafe(weekData?.week_end) || fallback.endDate;
+    const days = weekData?.days || [];
     const dates = [...Array(7)].map((_, i) => {
         const day = new Date(startDate);
         day.setDate(startDate.getDate() + i);
         return toLocalIsoDate(day);
     });
-
-    const indexByDate = new Map(dates.map((d, idx) => [d, idx]));
-    const totalsCal = Array(7).fill(0);
-    const totalsDur = Array(7).fill(0);
-    let workoutCount = 0;
-
-    for (const workout of arr || []) {
-        const key = String(workout.date || '').slice(0, 10);
-        const idx = indexByDate.get(key);
-        if (idx === undefined) continue;
-        totalsCal[idx] += safeNum(workout.calories);
-        totalsDur[idx] += safeNum(workout.duration);
-        workoutCount += 1;
-    }
+    const byDate = new Map(days.map(d => [d.date, d]));
 
     return {
         dates,
-        totalsCal: totalsCal.map(v => Math.max(0, v)),
-        totalsDur: totalsDur.map(v => Math.max(0, v)),
+        totalsCal: dates.map(d => safeNum(byDate.get(d)?.calories)),
+        totalsDur: dates.map(d => safeNum(byDate.get(d)?.minutes)),
         startDate,
         endDate,
-        workoutCount
+        workoutCount: safeNum(weekData?.totals?.workouts)
     };
 }
 
 function updateWeekControls(agg) {
-    const maxOffset = getMaxWeekOffset(activeWorkouts);
-    if (chartWeekOffset > maxOffset) chartWeekOffset = maxOffset;
     const currentWeekStart = getWeekWindow(0).startDate;
-    const earliestWeekStart = getWeekWindow(maxOffset).startDate;
+    const earliestWeekStart = getWeekWindow(maxWeekOffset).startDate;
 
     if (dom.weekRange) {
         dom.weekRange.textContent = formatWeekRange(agg.startDate, agg.endDate);
@@ -620,21 +650,19 @@ function updateWeekControls(agg) {
         btn.disabled = chartWeekOffset <= 0;
     });
     dom.weekPrevButtons?.forEach(btn => {
-        btn.disabled = chartWeekOffset >= maxOffset;
+        btn.disabled = chartWeekOffset >= maxWeekOffset;
     });
 }
 
 function shiftWeekWindow(direction) {
-    const maxOffset = getMaxWeekOffset(activeWorkouts);
     if (direction === 'prev') {
-        if (chartWeekOffset >= maxOffset) return;
+        if (chartWeekOffset >= maxWeekOffset) return;
         chartWeekOffset += 1;
     } else {
         if (chartWeekOffset <= 0) return;
         chartWeekOffset -= 1;
     }
-    renderAll();
-    announce(`Showing weekly progress for ${dom.weekRange?.textContent || 'selected week'}.`);
+    loadWeek();
 }
 
 function setWeekOffsetFromDate(targetDate) {
@@ -644,22 +672,17 @@ function setWeekOffsetFromDate(targetDate) {
     const diffDays = Math.floor((currentWeekStart - pickedStart) / DAY_MS);
     let nextOffset = Math.floor(diffDays / 7);
     if (!Number.isFinite(nextOffset)) return;
-    const maxOffset = getMaxWeekOffset(activeWorkouts);
-    nextOffset = Math.min(Math.max(nextOffset, 0), maxOffset);
+    nextOffset = Math.min(Math.max(nextOffset, 0), maxWeekOffset);
     if (nextOffset === chartWeekOffset) return;
     chartWeekOffset = nextOffset;
-    renderAll();
-    announce(`Showing weekly progress for ${dom.weekRange?.textContent || 'selected week'}.`);
+    loadWeek();
 }
 
 // ------------------- CHARTS -------------------
 let calChart, durChart;
 
 function renderCharts() {
-    const maxOffset = getMaxWeekOffset(activeWorkouts);
-    if (chartWeekOffset > maxOffset) chartWeekOffset = maxOffset;
-
-    const agg = aggregateWeekWindow(activeWorkouts, chartWeekOffset);
+    const agg = currentWeekAggregate();
     const labels = agg.dates.map(d => new Date(`${d}T00:00:00`).toLocaleDateString(UI_LOCALE, { weekday: 'short', day: 'numeric' }));
     const calOptions = buildChartOptions();
     const durOptions = buildChartOptions();
@@ -834,26 +857,14 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     dom.exportCSV?.addEventListener('click', () => {
-        const arr = activeWorkouts;
-        const escapeCsv = v => {
-            const s = String(v ?? '');
-            return /[",\n]/.test(s) ? `"${s.replace(/"/g, '""')}"` : s;
-        };
-        const csv = [
-            "Date,Activity,Duration,Calories",
-            ...arr.map(w => [
-                escapeCsv(w.date),
-                escapeCsv(w.activity),
-                escapeCsv(w.duration),
-                escapeCsv(w.calories)
-            ].join(','))
-        ].join("\n");
-        const bom = '\uFEFF'; // UTF-8 BOM for Excel/Unicode compatibility
-        const blob = new Blob([bom + csv], { type: 'text/csv;charset=utf-8;' });
-        const a = document.createElement('a'); a.href = URL.createObjectURL(blob); a.download = 'workouts.csv'; a.click();
-        URL.revokeObjectURL(a.href);
-        showToast('CSV exported.');
-        logImportExport('export', 'csv', arr.length, 'workouts.csv');
+        // Streamed and logged server-side; the browser only saves the download.
+        const a = document.createElement('a');
+        a.href = adminView && viewUserId
+            ? `/admin/api/workouts/${viewUserId}/export?format=csv`
+            : '/api/workouts/export?format=csv';
+        a.download = 'workouts.csv';
+        a.click();
+        showToast('CSV export started.');
     });
 
     dom.exportPDF?.addEventListener('click', () => {
@@ -941,11 +952,24 @@ document.addEventListener('DOMContentLoaded', () => {
             maybeAutoRefresh();
         }, FALLBACK_POLL_MS);
     };
+    let changeTimer = null;
+    const handleChangeEvent = (event) => {
+        let change = {};
+        try {
+            change = JSON.parse(event.data || '{}');
+        } catch {
+            change = {};
+        }
+        // Admins receive every user's changes; only react to the one on screen.
+        if (adminView && change.user_id != null && String(change.user_id) !== String(viewUserId)) return;
+        clearTimeout(changeTimer);
+        changeTimer = setTimeout(() => {
+            loadWorkouts();
+        }, CHANGE_DEBOUNCE_MS);
+    };
     if (window.EventSource) {
         eventSource = new EventSource('/events');
-        eventSource.onmessage = () => {
-            maybeAutoRefresh();
-        };
+        eventSource.addEventListener('change', handleChangeEvent);
         eventSource.onerror = () => {
             startFallbackPolling();
         };
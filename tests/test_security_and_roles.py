@@ -1,8 +1,9 @@
 import os
 import unittest
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 import werkzeug
+from sqlalchemy import event
 from werkzeug.security import check_password_hash, generate_password_hash
 
 TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
@@ -55,6 +56,11 @@ class SecurityRoleTests(unittest.TestCase):
             self.db.session.commit()
             self.admin_id = admin.id
             self.user_id = user.id
+        app_module.public_stats_cache.clear()
+        app_module.identity_cache.clear()
+        app_module.tag_id_cache.clear()
+        app_module.login_failures.clear()
+        app_module.rate_limiter.clear()
         self.client = self.app.test_client()
 
     def _csrf_from(self, route):
@@ -124,6 +130,122 @@ class SecurityRoleTests(unittest.TestCase):
             self.assertNotEqual(user.password, 'StrongPass123')
             self.assertTrue(check_password_hash(user.password, 'StrongPass123'))
 
+    def test_login_rehashes_passwords_made_under_an_old_policy(self):
+        with self.app.app_context():
+            user = self.db.session.get(self.User, self.user_id)
+            user.password = generate_password_hash('StrongPass123', method='pbkdf2:sha256:1000')
+            self.db.session.commit()
+
+        res = self._login_user()
+        self.assertEqual(res.status_code, 302)
+        self.assertIn('/user', res.headers.get('Location', ''))
+        with self.app.app_context():
+            stored = self.db.session.get(self.User, self.user_id).password
+        self.assertTrue(stored.startswith(self.app.config['PASSWORD_HASH_METHOD'] + '$'))
+        self.assertTrue(check_password_hash(stored, 'StrongPass123'))
+        self.assertFalse(app_module.password_needs_rehash(stored))
+
+    def test_login_succeeds_when_rehash_is_shed(self):
+        with self.app.app_context():
+            user = self.db.session.get(self.User, self.user_id)
+            user.password = generate_password_hash('StrongPass123', method='pbkdf2:sha256:1000')
+            self.db.session.commit()
+            old_hash = user.password
+
+        class VerifyOnlyPool(app_module.PasswordHashPool):
+            def hash(self, password, method):
+                raise app_module.PasswordHashPoolBusy()
+
+        original_pool = app_module.password_pool
+        app_module.password_pool = VerifyOnlyPool(workers=0, queue_size=0, timeout=1)
+        try:
+            res = self._login_user()
+        finally:
+            app_module.password_pool = original_pool
+        self.assertEqual(res.status_code, 302)
+        self.assertIn('/user', res.headers.get('Location', ''))
+        with self.app.app_context():
+            self.assertEqual(self.db.session.get(self.User, self.user_id).password, old_hash)
+
+    def test_login_is_shed_with_503_when_hash_pool_is_saturated(self):
+        busy_pool = app_module.PasswordHashPool(workers=1, queue_size=0, timeout=1)
+        busy_pool._slots.acquire()  # the only slot is taken by another login
+        original_pool = app_module.password_pool
+        app_module.password_pool = busy_pool
+        try:
+            res = self._login_user()
+            self.assertEqual(res.status_code, 503)
+            self.assertEqual(res.headers.get('Retry-After'), str(self.app.config['PASSWORD_HASH_RETRY_AFTER']))
+            with self.client.session_transaction() as sess:
+                self.assertNotIn('user_id', sess)
+            with self.app.app_context():
+                self.assertEqual(self.db.session.get(self.User, self.user_id).failed_attempts, 0)
+
+            res = self.client.post(
+                '/login',
+                data={'csrf_token': self._session_csrf(), 'email': 'student@example.com', 'password': 'StrongPass123'},
+                headers={'Accept': 'application/json'},
+            )
+            self.assertEqual(res.status_code, 503)
+            self.assertEqual(res.get_json().get('error'), 'server_busy')
+        finally:
+            app_module.password_pool = original_pool
+        self.assertEqual(self._login_user().status_code, 302)
+
+    def test_failed_logins_only_write_the_user_row_when_locking(self):
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = self.db.engine
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            for _ in range(app_module.MAX_FAILED_LOGIN_ATTEMPTS - 1):
+                self._login_user(password='WrongPass123')
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+        self.assertEqual([s for s in statements if s.lstrip().upper().startswith('UPDATE')], [])
+        with self.app.app_context():
+            self.assertIsNone(self.db.session.get(self.User, self.user_id).locked_until)
+
+        self._login_user(password='WrongPass123')
+        with self.app.app_context():
+            self.assertIsNotNone(self.db.session.get(self.User, self.user_id).locked_until)
+        res = self._login_user()
+        self.assertIn('/login', res.headers.get('Location', ''))
+        with self.client.session_transaction() as sess:
+            self.assertNotIn('user_id', sess)
+
+    def test_rate_limits_answer_429_with_retry_after(self):
+        original = self.app.config['RATE_LIMITS']
+        self.app.config['RATE_LIMITS'] = {
+            'POST /login': (2, 60),
+            'GET /api/public-stats': (3, 60),
+            'POST /workouts/*': (1, 60),
+        }
+        try:
+            self.assertEqual(self._login_user(password='WrongPass123').status_code, 302)
+            self.assertEqual(self._login_user().status_code, 302)
+            res = self._login_user()
+            self.assertEqual(res.status_code, 429)
+            self.assertGreaterEqual(int(res.headers['Retry-After']), 1)
+
+            # A prefix entry gives every route below it one shared bucket.
+            self.assertNotEqual(self._post_json('/workouts/batch/archive', {'ids': []}).status_code, 429)
+            res = self._post_json('/workouts/import', {'workouts': []})
+            self.assertEqual(res.status_code, 429)
+            self.assertEqual(res.get_json().get('error'), 'rate_limited')
+
+            for _ in range(3):
+                self.assertEqual(self.client.get('/api/public-stats').status_code, 200)
+            res = self.client.get('/api/public-stats?week_offset=1')
+            self.assertEqual(res.status_code, 429)
+            self.assertIn('Retry-After', res.headers)
+        finally:
+            self.app.config['RATE_LIMITS'] = original
+
     def test_register_rejects_reserved_admin_email(self):
         token = self._csrf_from('/register')
         res = self.client.post(
@@ -200,24 +322,154 @@ class SecurityRoleTests(unittest.TestCase):
             user = self.db.session.get(self.User, self.user_id)
             self.assertFalse(user.is_archived)
 
-    def test_admin_delete_removes_user_and_workouts(self):
+    def test_admin_archive_revokes_cached_session_identity(self):
+        self._login_user()
+        self.assertEqual(self.client.get('/api/workouts').status_code, 200)
+        user_client = self.client
+
+        self.client = self.app.test_client()
+        self._login_admin()
+        self.assertEqual(self._post_with_csrf(f'/admin/users/{self.user_id}/archive').status_code, 200)
+
+        res = user_client.get('/api/workouts')
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res.get_json().get('error'), 'session_invalid')
+
+    def test_admin_delete_runs_as_chunked_background_job(self):
+        with self.app.app_context():
+            tags = app_module.get_or_create_tags(['cardio'])
+            for _ in range(3):
+                workout = self.Workout(
+                    user_id=self.user_id,
+                    username='StudentUser',
+                    activity='running',
+                    duration=30,
+                    calories=300,
+                    date=date.today(),
+                    archived=False,
+                )
+                workout.tags = tags
+                self.db.session.add(workout)
+            self.db.session.commit()
+        self._login_admin()
+        chunk_size = self.app.config['USER_DELETION_CHUNK_SIZE']
+        self.app.config['USER_DELETION_CHUNK_SIZE'] = 2
+        try:
+            res = self._post_with_csrf(f'/admin/users/{self.user_id}/delete')
+            app_module.background_jobs.join()
+        finally:
+            self.app.config['USER_DELETION_CHUNK_SIZE'] = chunk_size
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(res.get_json()['job']['workouts_total'], 3)
+
+        status = self.client.get(res.get_json()['status_url']).get_json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['workouts_deleted'], 3)
+        self.assertIsNotNone(status['completed_at'])
+        with self.app.app_context():
+            self.assertIsNone(self.db.session.get(self.User, self.user_id))
+            self.assertEqual(self.Workout.query.filter_by(user_id=self.user_id).count(), 0)
+            self.assertEqual(self.db.session.execute(app_module.workout_tag.select()).all(), [])
+            audit = app_module.AdminAuditLog.query.filter_by(action='delete_user', target_user_id=self.user_id).one()
+            self.assertIsNotNone(audit.completed_at)
+
+    def test_admin_delete_resubmits_a_stale_running_job(self):
+        with self.app.app_context():
+            user = self.db.session.get(self.User, self.user_id)
+            user.is_archived = True
+            job = app_module.UserDeletionJob(user_id=self.user_id, username='StudentUser', status='running')
+            self.db.session.add(job)
+            self.db.session.commit()
+            job_id = job.id
+        self._login_admin()
+
+        # Still fresh: the job's worker may be alive, so it is left alone.
+        res = self._post_with_csrf(f'/admin/users/{self.user_id}/delete')
+        app_module.background_jobs.join()
+        self.assertEqual(res.get_json()['job']['status'], 'running')
+
+        with self.app.app_context():
+            job = self.db.session.get(app_module.UserDeletionJob, job_id)
+            job.updated_at = datetime.utcnow() - timedelta(days=2)
+            self.db.session.commit()
+        res = self._post_with_csrf(f'/admin/users/{self.user_id}/delete')
+        app_module.background_jobs.join()
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(res.get_json()['job']['id'], job_id)
+        with self.app.app_context():
+            self.assertEqual(self.db.session.get(app_module.UserDeletionJob, job_id).status, 'done')
+            self.assertIsNone(self.db.session.get(self.User, self.user_id))
+
+    def test_admin_data_links_avatars_instead_of_embedding_them(self):
+        self._login_user()
+        res = self._post_json('/api/avatar', {'avatar_url': 'data:image/png;base64,iVBORw0KGgo='})
+        self.assertEqual(res.status_code, 200)
+        self.client = self.app.test_client()
+        self._login_admin()
+        payload = self.client.get('/admin/data').get_json()
+        avatar_link = payload['user_stats'][0]['avatar_url']
+        self.assertFalse(avatar_link.startswith('data:'))
+        image_res = self.client.get(avatar_link)
+        self.assertEqual(image_res.status_code, 200)
+        self.assertEqual(image_res.mimetype, 'image/png')
+
+    def test_avatar_is_content_addressed_and_cacheable(self):
+        self._login_user()
+        res = self._post_json('/api/avatar', {'avatar_url': 'data:image/png;base64,iVBORw0KGgo='})
+        self.assertEqual(res.status_code, 200)
+        avatar_link = res.get_json()['avatar_url']
+        with self.app.app_context():
+            user = self.db.session.get(self.User, self.user_id)
+            self.assertIn(user.avatar_hash, avatar_link)
+            self.assertEqual(self.db.session.query(app_module.Avatar).count(), 1)
+
+        image_res = self.client.get(avatar_link)
+        self.assertEqual(image_res.status_code, 200)
+        self.assertIn('immutable', image_res.headers.get('Cache-Control', ''))
+        etag = image_res.headers.get('ETag')
+        cached_res = self.client.get(avatar_link, headers={'If-None-Match': etag})
+        self.assertEqual(cached_res.status_code, 304)
+
+        res = self._post_json('/api/avatar', {'avatar_url': 'data:image/gif;base64,R0lGODlh'})
+        self.assertEqual(res.status_code, 200)
         with self.app.app_context():
+            self.assertEqual(self.db.session.query(app_module.Avatar).count(), 1)
+
+    def test_admin_data_paginates_sorts_and_searches_in_sql(self):
+        with self.app.app_context():
+            for i in range(5):
+                self.db.session.add(self.User(
+                    username=f'pager{i}',
+                    email=f'pager{i}@example.com',
+                    password=generate_password_hash('StrongPass123'),
+                    role='user',
+                    is_archived=(i == 4),
+                ))
             self.db.session.add(self.Workout(
                 user_id=self.user_id,
                 username='StudentUser',
-                activity='running',
+                activity='run',
                 duration=30,
-                calories=300,
+                calories=900,
                 date=date.today(),
-                archived=False,
             ))
             self.db.session.commit()
         self._login_admin()
-        res = self._post_with_csrf(f'/admin/users/{self.user_id}/delete')
-        self.assertEqual(res.status_code, 200)
-        with self.app.app_context():
-            self.assertIsNone(self.db.session.get(self.User, self.user_id))
-            self.assertEqual(self.Workout.query.filter_by(user_id=self.user_id).count(), 0)
+
+        payload = self.client.get('/admin/data?q=pager&limit=2&page=2').get_json()
+        self.assertEqual([u['username'] for u in payload['user_stats']], ['pager2', 'pager3'])
+        self.assertEqual(payload['pagination']['active_total'], 4)
+        self.assertEqual(payload['pagination']['archived_total'], 1)
+        self.assertEqual(payload['pagination']['pages'], 2)
+        self.assertEqual(payload['archived_users'], [])
+
+        payload = self.client.get('/admin/data?sort=avg_cal_desc&status=active&limit=1').get_json()
+        self.assertEqual(payload['user_stats'][0]['id'], self.user_id)
+        self.assertEqual(payload['archived_users'], [])
+
+        res = self.client.get('/admin/data?sort=bogus')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.get_json().get('error'), 'invalid_sort')
 
     def test_admin_data_requires_admin_role(self):
         self._login_user()
@@ -260,6 +512,362 @@ class SecurityRoleTests(unittest.TestCase):
         self.assertEqual(len(data_after_restore.get('active', [])), 1)
         self.assertEqual(len(data_after_restore.get('archived', [])), 0)
 
+    def test_daily_summary_tracks_workout_deltas(self):
+        self._login_user()
+        today = date.today().isoformat()
+        first_id = self._post_json('/workouts', {
+            'activity': 'running', 'duration': 30, 'calories': 300, 'date': today,
+        }).get_json()['id']
+        self._post_json('/workouts', {
+            'activity': 'rowing', 'duration': 20, 'calories': 200, 'date': today,
+        })
+
+        def summary_totals():
+            with self.app.app_context():
+                summary = app_module.DailySummary.query.filter_by(user_id=self.user_id).first()
+                return (summary.total_workouts, summary.total_calories) if summary else None
+
+        self.assertEqual(summary_totals(), (2, 500))
+        self._post_with_csrf(f'/workouts/{first_id}/archive')
+        self._post_with_csrf(f'/workouts/{first_id}/archive')
+        self.assertEqual(summary_totals(), (1, 200))
+        self._post_with_csrf(f'/workouts/{first_id}/restore')
+        self.assertEqual(summary_totals(), (2, 500))
+
+        with self.app.app_context():
+            app_module.DailySummary.query.delete()
+            self.db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['reconcile-summaries'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(summary_totals(), (2, 500))
+
+    def test_batch_workout_actions_report_per_id_outcomes(self):
+        self._login_user()
+        today = date.today().isoformat()
+        ids = [
+            self._post_json('/workouts', {
+                'activity': 'running', 'duration': 30, 'calories': 100 * (i + 1), 'date': today, 'tags': 'cardio',
+            }).get_json()['id']
+            for i in range(3)
+        ]
+
+        def summary_totals():
+            with self.app.app_context():
+                summary = app_module.DailySummary.query.filter_by(user_id=self.user_id).first()
+                return (summary.total_workouts, summary.total_calories) if summary else None
+
+        res = self._post_json('/workouts/batch/archive', {'ids': [ids[0], ids[1], ids[0], 999999]})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['results'], [
+            {'id': ids[0], 'status': 'archived'},
+            {'id': ids[1], 'status': 'archived'},
+            {'id': 999999, 'status': 'not_found'},
+        ])
+        self.assertEqual(summary_totals(), (1, 300))
+
+        res = self._post_json('/workouts/batch/delete', {'ids': [ids[0], ids[2]]})
+        self.assertEqual(res.get_json()['changed'], 2)
+        self.assertEqual(summary_totals(), None)
+        with self.app.app_context():
+            self.assertEqual(self.Workout.query.filter_by(user_id=self.user_id).count(), 1)
+            tag_links = self.db.session.execute(
+                app_module.workout_tag.select().where(app_module.workout_tag.c.workout_id.in_([ids[0], ids[2]]))
+            ).all()
+            self.assertEqual(tag_links, [])
+
+        res = self._post_json('/workouts/batch/restore', {'ids': [ids[1], ids[1], ids[2]]})
+        self.assertEqual([item['status'] for item in res.get_json()['results']], ['restored', 'not_found'])
+        self.assertEqual(summary_totals(), (1, 200))
+
+        self.assertEqual(self._post_json('/workouts/batch/delete', {'ids': []}).status_code, 400)
+        self.assertEqual(self._post_json('/workouts/batch/delete', {'ids': ['1']}).status_code, 400)
+
+    def test_restore_all_and_clear_archive_keep_summaries_in_step(self):
+        self._login_user()
+        today = date.today()
+        ids = [
+            self._post_json('/workouts', {
+                'activity': 'running',
+                'duration': 30,
+                'calories': 100,
+                'date': (today - timedelta(days=i % 2)).isoformat(),
+                'tags': 'cardio',
+            }).get_json()['id']
+            for i in range(4)
+        ]
+
+        def summary_rows():
+            with self.app.app_context():
+                return sorted(
+                    (row.summary_date, row.total_workouts, row.total_calories)
+                    for row in app_module.DailySummary.query.filter_by(user_id=self.user_id)
+                )
+
+        full = summary_rows()
+        self._post_json('/workouts/batch/archive', {'ids': [ids[0], ids[1], ids[2]]})
+        self.assertEqual(len(summary_rows()), 1)
+        self._post_with_csrf('/workouts/restore-all')
+        self.assertEqual(summary_rows(), full)
+
+        self._post_json('/workouts/batch/archive', {'ids': [ids[0], ids[2]]})
+        archived_summaries = summary_rows()
+        self._post_with_csrf('/workouts/clear-archive')
+        self.assertEqual(summary_rows(), archived_summaries)
+        with self.app.app_context():
+            remaining = [w.id for w in self.Workout.query.filter_by(user_id=self.user_id)]
+            self.assertEqual(sorted(remaining), [ids[1], ids[3]])
+            tag_links = self.db.session.execute(app_module.workout_tag.select()).all()
+            self.assertEqual(len(tag_links), 2)
+        deleted = self.client.get('/api/workouts?since=0').get_json()['deleted']
+        self.assertEqual(sorted(deleted), [ids[0], ids[2]])
+
+    def test_tag_analytics_reads_maintained_tag_rollups(self):
+        self._login_user()
+        today = date.today().isoformat()
+        run_id = self._post_json('/workouts', {
+            'activity': 'running', 'duration': 30, 'calories': 300, 'date': today, 'tags': 'cardio,outdoor',
+        }).get_json()['id']
+        self._post_json('/workouts', {
+            'activity': 'rowing', 'duration': 20, 'calories': 200, 'date': today, 'tags': 'cardio',
+        })
+
+        res = self.client.get(f'/api/tags/analytics?from={today}&to={today}')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['tags'], [
+            {'tag': 'cardio', 'workouts': 2, 'minutes': 50, 'calories': 500},
+            {'tag': 'outdoor', 'workouts': 1, 'minutes': 30, 'calories': 300},
+        ])
+
+        self._post_with_csrf(f'/workouts/{run_id}/archive')
+        tags = self.client.get(f'/api/tags/analytics?from={today}&to={today}').get_json()['tags']
+        self.assertEqual(tags, [{'tag': 'cardio', 'workouts': 1, 'minutes': 20, 'calories': 200}])
+        self.assertEqual(self.client.get('/api/tags/analytics?from=2026-02-01&to=2026-01-01').status_code, 400)
+
+        with self.app.app_context():
+            app_module.TagDailySummary.query.delete()
+            self.db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['reconcile-summaries'])
+        self.assertEqual(result.exit_code, 0)
+
+        self._login_admin()
+        tags = self.client.get(f'/admin/api/tags/analytics?from={today}&to={today}').get_json()['tags']
+        self.assertEqual(tags, [{'tag': 'cardio', 'workouts': 1, 'minutes': 20, 'calories': 200}])
+
+    def test_weekly_workouts_api_returns_one_week_from_summaries(self):
+        self._login_user()
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+        for workout_date, calories in ((today, 300), (today, 200), (week_start - timedelta(days=14), 400)):
+            self._post_json('/workouts', {
+                'activity': 'running', 'duration': 30, 'calories': calories, 'date': workout_date.isoformat(),
+            })
+
+        payload = self.client.get('/api/workouts/weekly').get_json()
+        self.assertEqual(payload['week_start'], week_start.isoformat())
+        self.assertEqual(payload['max_week_offset'], 2)
+        self.assertEqual(len(payload['days']), 7)
+        self.assertEqual(payload['days'][today.weekday()], {
+            'date': today.isoformat(), 'workouts': 2, 'calories': 500, 'minutes': 60,
+        })
+        self.assertEqual(payload['totals'], {'workouts': 2, 'calories': 500, 'minutes': 60})
+
+        payload = self.client.get('/api/workouts/weekly?week_offset=5').get_json()
+        self.assertEqual(payload['week_offset'], 2)
+        self.assertEqual(payload['totals'], {'workouts': 1, 'calories': 400, 'minutes': 30})
+
+    def test_events_stream_publishes_typed_change_events(self):
+        with self.app.test_request_context('/events'):
+            app_module.session.update(user_id=self.user_id, role='user')
+            abandoned = app_module.events()
+            abandoned.close()  # closed before the body was ever iterated
+        self.assertNotIn(f'user:{self.user_id}', app_module.event_bus._channels)
+
+        self._login_user()
+        res = self.client.get('/events', buffered=False)
+        self.assertEqual(res.status_code, 200)
+        chunks = iter(res.response)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        try:
+            self._post_json('/workouts', {
+                'activity': 'rowing',
+                'duration': 20,
+                'calories': 180,
+                'date': date.today().isoformat(),
+            })
+            event = next(chunks).decode()
+        finally:
+            res.close()
+        self.assertTrue(event.startswith('event: change\n'))
+        self.assertIn('"type": "workout_created"', event)
+        self.assertIn(f'"user_id": {self.user_id}', event)
+
+    def test_public_stats_reads_daily_summary_rollups(self):
+        today = date.today()
+        with self.app.app_context():
+            self.db.session.add(app_module.DailySummary(
+                user_id=self.user_id,
+                username='StudentUser',
+                summary_date=today,
+                total_workouts=3,
+                total_calories=900,
+                total_duration=90,
+            ))
+            self.db.session.commit()
+        payload = self.client.get('/api/public-stats').get_json()
+        self.assertEqual(payload['weekly_workouts'], 3)
+        self.assertEqual(payload['calories_7d'], 900)
+        self.assertEqual(payload['weekly_calories'][today.weekday()], 900)
+
+    def test_public_stats_cache_invalidated_by_workout_writes(self):
+        self.assertEqual(self.client.get('/api/public-stats').get_json()['weekly_workouts'], 0)
+        self._login_user()
+        self._post_json('/workouts', {
+            'activity': 'running', 'duration': 30, 'calories': 300, 'date': date.today().isoformat(),
+        })
+        self.assertEqual(self.client.get('/api/public-stats').get_json()['weekly_workouts'], 1)
+
+    def test_bulk_import_reports_row_errors(self):
+        self._login_user()
+        today = date.today().isoformat()
+        res = self._post_json('/workouts/import', {
+            'format': 'json',
+            'filename': 'bulk.json',
+            'workouts': [
+                {'activity': 'running', 'duration': 30, 'calories': 300, 'date': today},
+                {'activity': 'rowing', 'duration': 20, 'calories': 200, 'date': today, 'tags': 'cardio'},
+                {'activity': 'swim', 'duration': 30, 'calories': 300, 'date': '2999-01-01'},
+            ],
+        })
+        self.assertEqual(res.status_code, 200)
+        payload = res.get_json()
+        self.assertEqual(payload.get('imported'), 2)
+        self.assertEqual(payload.get('errors'), [{'row': 2, 'error': 'invalid_date_range'}])
+
+        data = self.client.get('/api/workouts').get_json()
+        self.assertEqual(len(data.get('active', [])), 2)
+        tags = {w['activity']: w['tags'] for w in data['active']}
+        self.assertEqual(tags, {'running': [], 'rowing': ['cardio']})
+        with self.app.app_context():
+            summary = app_module.DailySummary.query.filter_by(user_id=self.user_id).one()
+            self.assertEqual(summary.total_workouts, 2)
+            log = app_module.ImportExportHistory.query.filter_by(user_id=self.user_id).one()
+            self.assertEqual(log.records, 2)
+
+    def test_api_workouts_cursor_pagination_and_date_window(self):
+        with self.app.app_context():
+            for days_back in range(5):
+                self.db.session.add(self.Workout(
+                    user_id=self.user_id,
+                    username='StudentUser',
+                    activity='running',
+                    duration=30,
+                    calories=300,
+                    date=date.today() - timedelta(days=days_back),
+                    archived=False,
+                ))
+            self.db.session.commit()
+        self._login_user()
+
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/workouts?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            payload = self.client.get(url).get_json()
+            self.assertLessEqual(len(payload['active']), 2)
+            seen.extend(item['date'] for item in payload['active'])
+            cursor = payload.get('next_cursor')
+            if not cursor:
+                break
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(seen), 5)
+
+        window_from = (date.today() - timedelta(days=1)).isoformat()
+        windowed = self.client.get(f'/api/workouts?from={window_from}&to={date.today().isoformat()}').get_json()
+        self.assertEqual(len(windowed['active']), 2)
+
+        bad = self.client.get('/api/workouts?cursor=not-a-cursor')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_api_workouts_since_token_returns_changes_and_tombstones(self):
+        self._login_user()
+        ids = []
+        for activity in ('run', 'swim', 'yoga'):
+            res = self._post_json('/workouts', {
+                'activity': activity,
+                'duration': 30,
+                'calories': 200,
+                'date': date.today().isoformat(),
+            })
+            ids.append(res.get_json()['id'])
+        token = self.client.get('/api/workouts').get_json()['sync_token']
+
+        unchanged = self.client.get(f'/api/workouts?since={token}').get_json()
+        self.assertEqual(unchanged['changed'], [])
+        self.assertEqual(unchanged['deleted'], [])
+        self.assertEqual(unchanged['sync_token'], token)
+
+        self._post_with_csrf(f'/workouts/{ids[0]}/archive')
+        self._post_with_csrf(f'/workouts/{ids[1]}/delete')
+        delta = self.client.get(f'/api/workouts?since={token}').get_json()
+        self.assertEqual([(w['id'], w['archived']) for w in delta['changed']], [(ids[0], True)])
+        self.assertEqual(delta['deleted'], [ids[1]])
+        self.assertNotEqual(delta['sync_token'], token)
+
+        res = self.client.get('/api/workouts?since=abc')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.get_json().get('error'), 'invalid_since')
+
+    def test_dashboard_endpoints_answer_conditional_gets(self):
+        self._login_user()
+        first = self.client.get('/api/workouts')
+        etag = first.headers.get('ETag')
+        self.assertTrue(etag)
+        self.assertEqual(first.headers.get('Cache-Control'), 'private, no-cache')
+
+        cached = self.client.get('/api/workouts', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+        self._post_json('/workouts', {
+            'activity': 'run',
+            'duration': 20,
+            'calories': 150,
+            'date': date.today().isoformat(),
+        })
+        changed = self.client.get('/api/workouts', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+
+        stats = self.client.get('/api/public-stats')
+        stats_etag = stats.headers.get('ETag')
+        self.assertEqual(self.client.get('/api/public-stats', headers={'If-None-Match': stats_etag}).status_code, 304)
+
+        self.client = self.app.test_client()
+        self._login_admin()
+        admin_etag = self.client.get('/admin/data').headers.get('ETag')
+        self.assertEqual(self.client.get('/admin/data', headers={'If-None-Match': admin_etag}).status_code, 304)
+        self._post_with_csrf(f'/admin/users/{self.user_id}/archive')
+        self.assertEqual(self.client.get('/admin/data', headers={'If-None-Match': admin_etag}).status_code, 200)
+        self.assertEqual(self.client.get('/api/public-stats', headers={'If-None-Match': stats_etag}).status_code, 200)
+
+    def test_workout_export_streams_csv_and_logs_history(self):
+        self._login_user()
+        self._post_json('/workouts', {
+            'activity': 'running',
+            'duration': 30,
+            'calories': 300,
+            'date': date.today().isoformat(),
+            'tags': 'cardio',
+        })
+        res = self.client.get('/api/workouts/export?format=csv')
+        self.assertEqual(res.status_code, 200)
+        lines = res.get_data(as_text=True).lstrip('\ufeff').splitlines()
+        self.assertEqual(lines[0], 'Date,Activity,Duration,Calories,Tags')
+        self.assertEqual(lines[1], f'{date.today().isoformat()},running,30,300,cardio')
+        with self.app.app_context():
+            log = app_module.ImportExportHistory.query.filter_by(user_id=self.user_id, action='export').one()
+            self.assertEqual(log.records, 1)
+            self.assertEqual(log.status, 'ok')
+
     def test_avatar_api_rejects_invalid_format(self):
         self._login_user()
         res = self._post_json('/api/avatar', {'avatar_url': 'https://example.com/a.jpg'})